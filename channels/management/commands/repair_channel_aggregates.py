@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from channels.models import Channel
+from videos.aggregates import refresh_channel_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute video_count, total_duration, max_order, last_uploaded_at and learner_count for channels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('channel_ids', nargs='*', type=int, help='Channels to repair (default: all)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        channel_ids = options['channel_ids'] or list(Channel.objects.order_by('pk').values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+
+        repaired = 0
+        for start in range(0, len(channel_ids), chunk_size):
+            repaired += refresh_channel_aggregates(channel_ids[start:start + chunk_size])
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired aggregates for {repaired} channels'))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:49
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def populate_aggregates(apps, schema_editor):
+    Channel = apps.get_model('channels', 'Channel')
+    Video = apps.get_model('videos', 'Video')
+    rows = Video.objects.order_by().values('channel_id').annotate(
+        count=Count('id'), duration=Sum('duration'), max_order=Max('order'), last=Max('uploaded_at')
+    )
+    for row in rows:
+        Channel.objects.filter(id=row['channel_id']).update(
+            video_count=row['count'],
+            total_duration=row['duration'] or 0,
+            max_order=row['max_order'] or 0,
+            last_uploaded_at=row['last'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0003_channel_ch_logo'),
+        ('videos', '0003_video_youtube_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='last_uploaded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='max_order',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='total_duration',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='video_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_learner_counts(apps, schema_editor):
+    Channel = apps.get_model('channels', 'Channel')
+    UserChannelProgress = apps.get_model('videos', 'UserChannelProgress')
+    rows = UserChannelProgress.objects.order_by().values('channel_id').annotate(count=Count('id'))
+    for row in rows:
+        Channel.objects.filter(id=row['channel_id']).update(learner_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0005_channel_order_version'),
+        ('videos', '0005_video_channel_order_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='learner_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='channel',
+            index=models.Index(fields=['-created_at', '-id'], name='channel_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='channel',
+            index=models.Index(fields=['-learner_count', '-id'], name='channel_popular_idx'),
+        ),
+        migrations.RunPython(populate_learner_counts, migrations.RunPython.noop),
+    ]
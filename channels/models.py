@@ -8,5 +8,23 @@ class Channel(models.Model):
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)  # <-- add this
     ch_logo= models.URLField(blank=True, null=True)
+
+    # Aggregates over the channel's videos, maintained by videos/aggregates.py
+    video_count = models.PositiveIntegerField(default=0)
+    total_duration = models.FloatField(default=0.0)
+    max_order = models.PositiveIntegerField(default=0)
+    last_uploaded_at = models.DateTimeField(null=True, blank=True)
+    # Users with a progress rollup on the channel; the catalogue's popularity sort
+    learner_count = models.PositiveIntegerField(default=0)
+
+    # Bumped by every bulk reorder; clients send it back to detect concurrent edits
+    order_version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='channel_recent_idx'),
+            models.Index(fields=['-learner_count', '-id'], name='channel_popular_idx'),
+        ]
+
     def __str__(self):
         return self.name
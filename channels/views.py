@@ -6,7 +6,10 @@ from django.utils.decorators import method_decorator
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import CreateView, UpdateView, DeleteView, ListView, DetailView
 from .models import Channel
-from videos.models import VideoProgress
+from videos.engagement import TRENDING_ORDER
+from videos.pagination import keyset_page
+from videos.views import playlist_page_queryset
+from videos.progress import first_incomplete_video, get_channel_completion, get_progress_index, get_channel_progress
 
 
 # -------------------------
@@ -30,6 +33,28 @@ class ChannelListView(ListView):
     model = Channel
     template_name = 'channels/list.html'
     context_object_name = 'channels'  # optional, for clarity in template
+    paginate_by = 24
+
+    # Each ordering is served by an index on Channel or ChannelEngagement
+    ordering_map = {
+        'recent': ('-created_at', '-id'),
+        'popular': ('-learner_count', '-id'),
+        'trending': TRENDING_ORDER,
+    }
+
+    def get_order_by(self):
+        order_by = self.request.GET.get('order_by', 'recent')
+        return order_by if order_by in self.ordering_map else 'recent'
+
+    def get_queryset(self):
+        # video_count/total_duration/learner_count are stored on Channel, so one query covers the page
+        return Channel.objects.select_related('owner').order_by(*self.ordering_map[self.get_order_by()])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['order_by'] = self.get_order_by()
+        context['completion'] = get_channel_completion(self.request.user, context['channels'])
+        return context
 
 # -------------------------
 # Channel Detail
@@ -42,37 +67,17 @@ class ChannelDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         channel = self.object
-        videos = channel.videos.all().order_by('order')
-        context['videos'] = videos
-
-        progress_dict = {}
-        completed_count = 0
-        first_incomplete = None
-
-        # Only query VideoProgress if user is authenticated
-        if self.request.user.is_authenticated:
-            for video in videos:
-                try:
-                    prog = VideoProgress.objects.get(user=self.request.user, video=video)
-                    progress_dict[video.id] = prog
-                    if prog.watched_percentage >= 95:
-                        completed_count += 1
-                    if not first_incomplete and prog.watched_percentage < 95:
-                        first_incomplete = video
-                except VideoProgress.DoesNotExist:
-                    progress_dict[video.id] = None
-                    if not first_incomplete:
-                        first_incomplete = video
-        else:
-            # For anonymous users
-            for video in videos:
-                progress_dict[video.id] = None
-
-        context['progress_dict'] = progress_dict
-        context['completed_videos'] = completed_count
-        context['total_videos'] = videos.count()
-        context['progress_percent'] = int((completed_count / videos.count()) * 100) if videos.exists() else 0
-        context['first_incomplete'] = first_incomplete
+        videos, next_cursor = keyset_page(playlist_page_queryset(channel.id))
+        index = get_progress_index(self.request.user, videos)
+        channel_progress = get_channel_progress(self.request.user, channel)
+
+        context['videos'] = index['videos']
+        context['progress_dict'] = index['progress_dict']
+        context['next_cursor'] = next_cursor
+        context['completed_videos'] = channel_progress.completed_videos if channel_progress else 0
+        context['total_videos'] = channel.video_count
+        context['progress_percent'] = channel_progress.progress_percent if channel_progress else 0
+        context['first_incomplete'] = first_incomplete_video(self.request.user, channel.id)
 
         return context
     
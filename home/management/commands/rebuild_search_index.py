@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 search index over videos and channels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not search.fts_enabled():
+            raise CommandError('The full-text search index requires SQLite with FTS5')
+        total = search.rebuild_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} videos and channels'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from home import stats
+
+
+class Command(BaseCommand):
+    help = 'Recount the site-wide counters shown on the home page and fix any drift'
+
+    def handle(self, *args, **options):
+        drifted = stats.reconcile()
+        for name, (old, new) in drifted.items():
+            self.stdout.write(f'{name}: {old} -> {new}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled {len(stats.COUNTED_MODELS)} counters, {len(drifted)} corrected'
+        ))
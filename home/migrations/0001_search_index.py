@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS home_search_index USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, title, body, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO home_search_index (kind, object_id, title, body) "
+        "SELECT 'channel', id, name, description FROM channels_channel"
+    )
+    schema_editor.execute(
+        "INSERT INTO home_search_index (kind, object_id, title, body) "
+        "SELECT 'video', id, title, description FROM videos_video"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS home_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0004_channel_aggregates'),
+        ('videos', '0004_user_channel_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    SiteCounter = apps.get_model('home', 'SiteCounter')
+    models_by_name = {
+        'videos': apps.get_model('videos', 'Video'),
+        'channels': apps.get_model('channels', 'Channel'),
+        'users': apps.get_model(settings.AUTH_USER_MODEL),
+    }
+    SiteCounter.objects.bulk_create([
+        SiteCounter(name=name, value=model.objects.count())
+        for name, model in models_by_name.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0001_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
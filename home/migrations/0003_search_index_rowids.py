@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# Mirrors home.search.KIND_CODES: rowid = object_id * 2 + code
+REINDEX = [
+    "DELETE FROM home_search_index",
+    "INSERT INTO home_search_index (rowid, kind, object_id, title, body) "
+    "SELECT id * 2 + 1, 'channel', id, name, description FROM channels_channel",
+    "INSERT INTO home_search_index (rowid, kind, object_id, title, body) "
+    "SELECT id * 2, 'video', id, title, description FROM videos_video",
+]
+
+
+def key_rows_by_rowid(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in REINDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_site_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_rows_by_rowid, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,15 @@
 from django.db import models
 
-# Create your models here.
+
+class SiteCounter(models.Model):
+    """Site-wide row counts kept up to date by home/signals.py.
+
+    Read through home.stats, which fronts the table with a TTL cache; run
+    ``manage.py reconcile_site_stats`` to correct any drift.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
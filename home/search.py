@@ -0,0 +1,204 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from channels.models import Channel
+from videos.models import Video
+
+SEARCH_TABLE = 'home_search_index'
+RESULTS_PER_PAGE = 20
+
+# Index rows are keyed by rowid = object_id * len(KIND_CODES) + code, so
+# replacing or removing a row is a rowid lookup instead of a table scan
+# (kind and object_id are UNINDEXED columns)
+KIND_CODES = {'video': 0, 'channel': 1}
+
+# bm25 column weights: (kind, object_id, title, body)
+BM25_WEIGHTS = (0.0, 0.0, 10.0, 1.0)
+
+# Control characters cannot appear in indexed text, so they are safe snippet markers
+_MARK_START, _MARK_END = '\x02', '\x03'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 query: every token must match, as a prefix"""
+    tokens = _TOKEN_RE.findall(query.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _highlight(snippet):
+    html = escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+    return mark_safe(html)
+
+
+# -------------------------
+# Index maintenance
+# -------------------------
+def index_rowid(kind, object_id):
+    return object_id * len(KIND_CODES) + KIND_CODES[kind]
+
+
+def _replace_rows(kind, rows):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(index_rowid(kind, object_id),) for object_id, _, _ in rows],
+        )
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+            [(index_rowid(kind, object_id), kind, object_id, title, body or '') for object_id, title, body in rows],
+        )
+
+
+def index_videos(videos):
+    _replace_rows('video', [(v.id, v.title, v.description) for v in videos])
+
+
+def index_channels(channels):
+    _replace_rows('channel', [(c.id, c.name, c.description) for c in channels])
+
+
+def remove_from_index(kind, object_ids):
+    if not fts_enabled() or not object_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(index_rowid(kind, object_id),) for object_id in object_ids],
+        )
+
+
+def rebuild_index(chunk_size=1000):
+    """Repopulate the whole index from the Video and Channel tables"""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    total = 0
+    for model, indexer in ((Channel, index_channels), (Video, index_videos)):
+        last_pk = 0
+        while True:
+            chunk = list(model.objects.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+            if not chunk:
+                break
+            indexer(chunk)
+            total += len(chunk)
+            last_pk = chunk[-1].pk
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return total
+
+
+# -------------------------
+# Querying
+# -------------------------
+def search(query, page=1, per_page=RESULTS_PER_PAGE):
+    """Ranked search over videos and channels.
+
+    Returns a dict with the page of ``videos`` and ``channels`` (each object
+    carries a ``search_snippet``), per-kind counts and pagination info.
+    """
+    if fts_enabled():
+        return _search_fts(query, page, per_page)
+    return _search_fallback(query, page, per_page)
+
+
+def _page_info(total, page, per_page):
+    num_pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), num_pages)
+    return page, num_pages
+
+
+def _search_fts(query, page, per_page):
+    match = build_match_query(query)
+    results = {
+        'videos': [], 'channels': [],
+        'video_count': 0, 'channel_count': 0, 'total_results': 0,
+        'page': 1, 'num_pages': 1,
+    }
+    if not match:
+        return results
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT kind, COUNT(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s GROUP BY kind',
+            [match],
+        )
+        counts = dict(cursor.fetchall())
+        total = sum(counts.values())
+        page, num_pages = _page_info(total, page, per_page)
+
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        cursor.execute(
+            f"""
+            SELECT kind, object_id,
+                   snippet({SEARCH_TABLE}, -1, %s, %s, '…', 16)
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH %s
+            ORDER BY bm25({SEARCH_TABLE}, {weights})
+            LIMIT %s OFFSET %s
+            """,
+            [_MARK_START, _MARK_END, match, per_page, (page - 1) * per_page],
+        )
+        rows = cursor.fetchall()
+
+    snippets = {(kind, int(object_id)): snippet for kind, object_id, snippet in rows}
+    video_ids = [object_id for kind, object_id in snippets if kind == 'video']
+    channel_ids = [object_id for kind, object_id in snippets if kind == 'channel']
+
+    videos = Video.objects.select_related('channel').defer('channel__description').in_bulk(video_ids)
+    channels = Channel.objects.select_related('owner').in_bulk(channel_ids)
+
+    for (kind, object_id) in snippets:
+        source = videos if kind == 'video' else channels
+        obj = source.get(object_id)
+        if obj is None:
+            continue  # stale index row; fixed by the next rebuild
+        obj.search_snippet = _highlight(snippets[(kind, object_id)])
+        results['videos' if kind == 'video' else 'channels'].append(obj)
+
+    results.update({
+        'video_count': counts.get('video', 0),
+        'channel_count': counts.get('channel', 0),
+        'total_results': total,
+        'page': page,
+        'num_pages': num_pages,
+    })
+    return results
+
+
+def _search_fallback(query, page, per_page):
+    video_results = Video.objects.filter(
+        Q(title__icontains=query) | Q(description__icontains=query)
+    ).select_related('channel').order_by('channel_id', 'order')
+    channel_results = Channel.objects.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).select_related('owner').order_by('name')
+
+    video_count = video_results.count()
+    channel_count = channel_results.count()
+    total = video_count + channel_count
+    page, num_pages = _page_info(total, page, per_page)
+
+    start, end = (page - 1) * per_page, page * per_page
+    channels = list(channel_results[start:end]) if start < channel_count else []
+    video_start = max(start - channel_count, 0)
+    videos = list(video_results[video_start:end - channel_count]) if end > channel_count else []
+
+    return {
+        'videos': videos, 'channels': channels,
+        'video_count': video_count, 'channel_count': channel_count, 'total_results': total,
+        'page': page, 'num_pages': num_pages,
+    }
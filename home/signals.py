@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from channels.models import Channel
+from videos.importer import videos_imported
+from videos.models import Video
+from . import search, stats
+
+
+@receiver(post_save, sender=Video)
+def index_video(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_videos([instance])
+    if created:
+        stats.increment('videos')
+
+
+@receiver(videos_imported, sender=Video)
+def index_imported_videos(sender, videos, **kwargs):
+    search.index_videos(videos)
+    stats.increment('videos', len(videos))
+
+
+@receiver(post_delete, sender=Video)
+def unindex_video(sender, instance, **kwargs):
+    search.remove_from_index('video', [instance.pk])
+    stats.increment('videos', -1)
+
+
+@receiver(post_save, sender=Channel)
+def index_channel(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.increment('channels')
+    # Aggregate-only updates do not touch searchable text
+    if update_fields is not None and not {'name', 'description'} & set(update_fields):
+        return
+    search.index_channels([instance])
+    stats.invalidate_featured()
+
+
+@receiver(post_delete, sender=Channel)
+def unindex_channel(sender, instance, **kwargs):
+    search.remove_from_index('channel', [instance.pk])
+    stats.increment('channels', -1)
+    stats.invalidate_featured()
+
+
+@receiver(post_save, sender=User)
+def count_new_user(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.increment('users')
+
+
+@receiver(post_delete, sender=User)
+def count_deleted_user(sender, instance, **kwargs):
+    stats.increment('users', -1)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.timezone import now
+
+from channels.models import Channel
+from videos.engagement import TRENDING_ORDER
+from videos.models import Video
+from .models import SiteCounter
+
+STATS_CACHE_KEY = 'home:site_stats'
+FEATURED_CACHE_KEY = 'home:featured_channels'
+FEATURED_CHANNEL_COUNT = 4
+
+# Counter name -> model whose rows it counts
+COUNTED_MODELS = {
+    'videos': Video,
+    'channels': Channel,
+    'users': User,
+}
+
+
+def _cache_ttl():
+    return getattr(settings, 'SITE_STATS_CACHE_TTL', 300)
+
+
+def increment(name, delta=1):
+    """Adjust a counter in place; a missing row is seeded from a real count"""
+    if not SiteCounter.objects.filter(name=name).update(value=F('value') + delta, updated_at=now()):
+        reconcile([name])
+
+
+def get_site_stats():
+    """Return ``{'videos': n, 'channels': n, 'users': n}``, cached for SITE_STATS_CACHE_TTL"""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = {name: 0 for name in COUNTED_MODELS}
+        stats.update(SiteCounter.objects.filter(name__in=COUNTED_MODELS).values_list('name', 'value'))
+        cache.set(STATS_CACHE_KEY, stats, _cache_ttl())
+    return stats
+
+
+def get_featured_channels():
+    """The most watched channels this week per ChannelEngagement, topped up with the newest"""
+    channels = cache.get(FEATURED_CACHE_KEY)
+    if channels is None:
+        channels = list(
+            Channel.objects.only('id', 'name', 'description', 'ch_logo')
+            .order_by(*TRENDING_ORDER)[:FEATURED_CHANNEL_COUNT]
+        )
+        cache.set(FEATURED_CACHE_KEY, channels, _cache_ttl())
+    return channels
+
+
+def invalidate_featured():
+    cache.delete(FEATURED_CACHE_KEY)
+
+
+def reconcile(names=None):
+    """Recount the given counters (default: all) and return ``{name: (old, new)}`` for any that drifted"""
+    names = names or list(COUNTED_MODELS)
+    stored = dict(SiteCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    counters = [SiteCounter(name=name, value=COUNTED_MODELS[name].objects.count(), updated_at=now()) for name in names]
+    SiteCounter.objects.bulk_create(
+        counters, update_conflicts=True, unique_fields=['name'], update_fields=['value', 'updated_at'],
+    )
+    cache.delete(STATS_CACHE_KEY)
+    return {
+        counter.name: (stored.get(counter.name), counter.value)
+        for counter in counters
+        if stored.get(counter.name) != counter.value
+    }
@@ -1,22 +1,15 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from videos.models import Video
-from channels.models import Channel
-from django.contrib.auth.models import User
-from django.db.models import Q
+from . import search, stats
 
 def home(request):
-    featured_channels = Channel.objects.all()[:4]  
-    
-    total_videos = Video.objects.count()
-    total_channels = Channel.objects.count()
-    total_users = User.objects.count()
-    
+    site_stats = stats.get_site_stats()
+
     context = {
-        'featured_channels': featured_channels,
-        'total_videos': total_videos,
-        'total_channels': total_channels,
-        'total_users': total_users,
+        'featured_channels': stats.get_featured_channels(),
+        'total_videos': site_stats['videos'],
+        'total_channels': site_stats['channels'],
+        'total_users': site_stats['users'],
     }
     
     return render(request, 'home/home.html', context)
@@ -28,24 +21,10 @@ def search_view(request):
     results = []
     
     if query:
-        # Search in videos (title, description) and channels (name)
-        video_results = Video.objects.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query)
-        ).select_related('channel')
-        
-        channel_results = Channel.objects.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query)
-        )
-        
-        results = {
-            'videos': video_results,
-            'channels': channel_results,
-            'total_results': video_results.count() + channel_results.count()
-        }
+        page = request.GET.get('page', '1')
+        results = search.search(query, page=int(page) if page.isdigit() else 1)
     
     return render(request, 'home/search_results.html', {
         'query': query, 
         'results': results
-    })
\ No newline at end of file
+    })
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -86,6 +87,25 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Must be shared by every worker process: the autocomplete generation counter
+# and the "invalidated on change" home, category, facet and learning-stats
+# caches are only coherent if all workers see the same entries. The default
+# per-process LocMemCache would let other Gunicorn workers serve stale data
+# until the TTL. The file-based cache is shared by all workers on one host;
+# point this at Redis or Memcached when running on more than one host.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'pytube-cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -130,4 +150,25 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = 'home:home'
-LOGOUT_REDIRECT_URL = 'home:home'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'home:home'
+
+# Video progress write-behind buffering (videos/buffer.py)
+PROGRESS_WRITE_BEHIND = False
+PROGRESS_FLUSH_INTERVAL = 10  # seconds between batched flushes
+PROGRESS_BUFFER_SIZE = 200  # buffered (user, video) pairs before forcing a flush
+
+# Live search autocomplete (videos/autocomplete.py)
+AUTOCOMPLETE_CACHE_TTL = 60  # seconds a response for a prefix is cached
+AUTOCOMPLETE_INDEX_MAX_AGE = 300  # rebuild the per-worker index at least this often
+
+# Home page counters (home/stats.py)
+SITE_STATS_CACHE_TTL = 300  # seconds the counters and featured channels are cached
+
+# Roadmap category page (roadmaps/categories.py)
+ROADMAP_CATEGORIES_CACHE_TTL = 600  # seconds; also invalidated on roadmap and follow changes
+
+# Roadmap search facets (roadmaps/search.py)
+ROADMAP_SEARCH_CACHE_TTL = 300  # seconds facet counts for a normalized query are cached
+
+# Per-user learning dashboard (roadmaps/learning_stats.py)
+LEARNING_STATS_CACHE_TTL = 300  # seconds; also invalidated by every progress and follow change
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Roadmap, RoadmapChannel, RoadmapFollow
+from .models import Roadmap, RoadmapChannel, RoadmapFollow, UserLearningStats
 
 @admin.register(Roadmap)
 class RoadmapAdmin(admin.ModelAdmin):
@@ -19,4 +19,10 @@ class RoadmapFollowAdmin(admin.ModelAdmin):
     list_display = ['user', 'roadmap', 'started_at', 'completed_at', 'current_channel_order']
     list_filter = ['started_at', 'completed_at']
     search_fields = ['user__username', 'roadmap__title']
-    readonly_fields = ['started_at']
\ No newline at end of file
+    readonly_fields = ['started_at']
+
+@admin.register(UserLearningStats)
+class UserLearningStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'following_count', 'completed_count', 'watched_seconds', 'current_streak', 'longest_streak', 'last_active_on']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.db.models import Count, Max, Q
+
+API_VERSION = 1
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 500
+# Pages larger than this are streamed row by row instead of built in memory
+API_STREAM_THRESHOLD = 100
+
+# field name -> (model fields to load, value getter)
+API_FIELDS = {
+    'id': (['id'], lambda r: r.id),
+    'title': (['title'], lambda r: r.title),
+    'description': (['description'], lambda r: r.description),
+    'difficulty': (['difficulty'], lambda r: r.difficulty),
+    'estimated_hours': (['estimated_hours'], lambda r: r.estimated_hours),
+    'owner': (['owner__username'], lambda r: r.owner.username),
+    'video_count': (['video_count'], lambda r: r.video_count),
+    'follower_count': (['follower_count'], lambda r: r.follower_count),
+    'channel_count': (['channel_count'], lambda r: r.channel_count),
+    'created_at': (['created_at'], lambda r: r.created_at.isoformat()),
+    'updated_at': (['updated_at'], lambda r: r.updated_at.isoformat()),
+}
+# description is opt-in: it is by far the largest field
+DEFAULT_FIELDS = [name for name in API_FIELDS if name != 'description']
+
+
+def encode_cursor(roadmap):
+    raw = f"{roadmap.created_at.isoformat()}|{roadmap.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Parse an opaque (created_at, id) cursor; raises ValueError on malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    created_at, _, roadmap_id = raw.partition('|')
+    return datetime.fromisoformat(created_at), int(roadmap_id)
+
+
+def parse_fields(value):
+    """Validate a comma separated ``fields`` parameter; raises ValueError on unknown names"""
+    if not value:
+        return DEFAULT_FIELDS
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit(value):
+    if not value:
+        return API_PAGE_SIZE
+    limit = int(value)
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {API_MAX_PAGE_SIZE}')
+    return limit
+
+
+def validators(queryset, params):
+    """``(etag, last_modified)`` for a request, from one aggregate over the filtered rows.
+
+    The count catches deletions, which do not move MAX(updated_at); counter
+    updates touch updated_at themselves (roadmaps/counters.py).
+    """
+    state = queryset.order_by().aggregate(last_modified=Max('updated_at'), total=Count('id'))
+    last_modified = state['last_modified']
+    key = json.dumps([API_VERSION, sorted(params.items()), last_modified and last_modified.isoformat(), state['total']])
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+
+def page_queryset(queryset, fields, cursor=None):
+    """Rows after ``cursor`` in (created_at, id) descending order, loading only ``fields``"""
+    if cursor:
+        created_at, roadmap_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=roadmap_id))
+
+    columns = {'id', 'created_at'}
+    for name in fields:
+        columns.update(API_FIELDS[name][0])
+    if 'owner' in fields:
+        queryset = queryset.select_related('owner')
+    return queryset.only(*columns).order_by('-created_at', '-id')
+
+
+def serialize(roadmap, fields):
+    return {name: API_FIELDS[name][1](roadmap) for name in fields}
+
+
+def render_page(queryset, fields, limit):
+    """Build a whole page as a dict"""
+    rows = list(queryset[:limit + 1])
+    return {
+        'version': API_VERSION,
+        'results': [serialize(r, fields) for r in rows[:limit]],
+        'next': encode_cursor(rows[limit - 1]) if len(rows) > limit else None,
+    }
+
+
+def stream_page(queryset, fields, limit):
+    """Yield a page as JSON text, one row at a time, ending with the next cursor"""
+    yield f'{{"version": {API_VERSION}, "results": ['
+    last = None
+    for i, roadmap in enumerate(queryset[:limit + 1].iterator(chunk_size=API_STREAM_THRESHOLD)):
+        if i == limit:
+            yield f'], "next": {json.dumps(encode_cursor(last))}}}'
+            return
+        yield (', ' if i else '') + json.dumps(serialize(roadmap, fields))
+        last = roadmap
+    yield '], "next": null}'
@@ -3,4 +3,6 @@ from django.apps import AppConfig
 class RoadmapsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'roadmaps'
-    verbose_name = 'Learning Roadmaps'
\ No newline at end of file
+    verbose_name = 'Learning Roadmaps'
+    def ready(self):
+        from . import signals  # noqa: F401
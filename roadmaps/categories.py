@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Roadmap
+
+CATEGORIES_CACHE_KEY = 'roadmaps:categories'
+ROADMAPS_PER_CATEGORY = 6
+CATEGORY_ICONS = {'beginner': '🎯', 'intermediate': '🚀', 'advanced': '🏆'}
+
+
+def build_categories():
+    """Top public roadmaps per difficulty by followers, from one ROW_NUMBER() query"""
+    ranked = (
+        Roadmap.objects.filter(is_public=True)
+        .only('id', 'title', 'description', 'difficulty', 'estimated_hours', 'follower_count')
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=F('difficulty'),
+            order_by=[F('follower_count').desc(), F('id').desc()],
+        ))
+        .filter(rank__lte=ROADMAPS_PER_CATEGORY)
+        .order_by('difficulty', 'rank')
+    )
+
+    categories = {
+        difficulty: {'roadmaps': [], 'display_name': display_name, 'icon': CATEGORY_ICONS[difficulty]}
+        for difficulty, display_name in Roadmap.DIFFICULTY_CHOICES
+    }
+    for roadmap in ranked:
+        categories[roadmap.difficulty]['roadmaps'].append(roadmap)
+    return categories
+
+
+def get_categories():
+    """Cached category listing; rebuilt with a single query on a miss"""
+    categories = cache.get(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = build_categories()
+        cache.set(CATEGORIES_CACHE_KEY, categories, getattr(settings, 'ROADMAP_CATEGORIES_CACHE_TTL', 600))
+    return categories
+
+
+def invalidate_categories():
+    cache.delete(CATEGORIES_CACHE_KEY)
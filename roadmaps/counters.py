@@ -0,0 +1,73 @@
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Ceil, Coalesce
+from django.utils.timezone import now
+
+from . import search
+from .categories import invalidate_categories
+from .models import Roadmap, RoadmapChannel, RoadmapFollow
+
+
+def adjust(roadmap_id, followers=0, channels=0):
+    """Shift a roadmap's stored counters in place with F() expressions"""
+    # updated_at is bumped by hand since update() skips auto_now; API clients revalidate on it
+    changes = {}
+    if followers:
+        changes['follower_count'] = F('follower_count') + followers
+    if channels:
+        changes['channel_count'] = F('channel_count') + channels
+    if changes:
+        Roadmap.objects.filter(pk=roadmap_id).update(updated_at=now(), **changes)
+
+
+def _count(model):
+    return Coalesce(Subquery(
+        model.objects.filter(roadmap_id=OuterRef('pk'))
+        .order_by()
+        .values('roadmap_id')
+        .annotate(value=Count('id'))
+        .values('value')[:1]
+    ), Value(0))
+
+
+def repair(roadmap_ids=None):
+    """Recount follower_count and channel_count in one UPDATE; returns rows updated"""
+    roadmaps = Roadmap.objects.all() if roadmap_ids is None else Roadmap.objects.filter(pk__in=roadmap_ids)
+    updated = roadmaps.update(
+        follower_count=_count(RoadmapFollow),
+        channel_count=_count(RoadmapChannel),
+        updated_at=now(),
+    )
+    invalidate_categories()
+    return updated
+
+
+def _channel_total(field):
+    return Coalesce(Subquery(
+        RoadmapChannel.objects.filter(roadmap_id=OuterRef('pk'))
+        .order_by()
+        .values('roadmap_id')
+        .annotate(value=Sum(field))
+        .values('value')[:1]
+    ), Value(0))
+
+
+def refresh_totals(roadmap_ids=None):
+    """Recompute estimated_hours and video_count from the channels' stored aggregates in one UPDATE"""
+    roadmaps = Roadmap.objects.all() if roadmap_ids is None else Roadmap.objects.filter(pk__in=roadmap_ids)
+    updated = roadmaps.update(
+        estimated_hours=Ceil(_channel_total('channel__total_duration') / 3600.0),
+        video_count=_channel_total('channel__video_count'),
+        updated_at=now(),
+    )
+    if updated:
+        invalidate_categories()
+        search.bump_generation()
+    return updated
+
+
+def refresh_totals_for_channels(channel_ids):
+    """refresh_totals() for the roadmaps containing any of ``channel_ids``"""
+    roadmap_ids = list(
+        RoadmapChannel.objects.filter(channel_id__in=channel_ids).values_list('roadmap_id', flat=True).distinct()
+    )
+    return refresh_totals(roadmap_ids) if roadmap_ids else 0
@@ -0,0 +1,24 @@
+from . import search
+
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+
+
+def filter_roadmaps(queryset, params):
+    """Apply the roadmap list's search, difficulty, hours and max_hours filters from ``params``"""
+    search_query = params.get('search')
+    if search_query:
+        queryset = search.matching(queryset, search_query)
+
+    difficulty = params.get('difficulty')
+    if difficulty in DIFFICULTIES:
+        queryset = queryset.filter(difficulty=difficulty)
+
+    hours = search.hours_filter(params.get('hours'))
+    if hours is not None:
+        queryset = queryset.filter(hours)
+
+    max_hours = params.get('max_hours')
+    if max_hours and max_hours.isdigit():
+        queryset = queryset.filter(estimated_hours__lte=int(max_hours))
+
+    return queryset
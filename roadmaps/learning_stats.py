@@ -0,0 +1,234 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from videos.models import UserChannelProgress, VideoProgress
+from .models import Roadmap, RoadmapFollow, UserDailyWatch, UserLearningStats
+
+# Days of per-day watch time served with the snapshot
+ACTIVITY_DAYS = 30
+
+
+def _cache_key(user_id):
+    return f'learning_stats:{user_id}'
+
+
+def invalidate(user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def _count(model, user_field, **filters):
+    return Coalesce(Subquery(
+        model.objects.filter(**{user_field: OuterRef('user_id')}, **filters)
+        .order_by()
+        .values(user_field)
+        .annotate(value=Count('id'))
+        .values('value')[:1]
+    ), Value(0))
+
+
+def _streaks(days):
+    """``(current, longest, last_active_on)`` from an ascending list of active dates"""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest, previous
+
+
+# -------------------------
+# Write path
+# -------------------------
+def refresh_counts(user_ids):
+    """Recount created, following and completed roadmaps for the given users in one UPDATE"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    updated = UserLearningStats.objects.filter(user_id__in=user_ids).update(
+        created_count=_count(Roadmap, 'owner_id'),
+        following_count=_count(RoadmapFollow, 'user_id'),
+        completed_count=_count(RoadmapFollow, 'user_id', completed_at__isnull=False),
+    )
+    if updated < len(user_ids):
+        missing = user_ids - set(UserLearningStats.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        rebuild(missing)
+    invalidate(user_ids)
+
+
+def add_watch_time(seconds, credit=True):
+    """Apply ``{user_id: delta}`` rollup changes to today's watch time, the totals and the streaks.
+
+    With ``credit=False`` (rollup repairs) only the totals move.
+    """
+    today = timezone.localdate()
+    yesterday = today - timedelta(days=1)
+    streak = Case(
+        When(last_active_on=today, then=F('current_streak')),
+        When(last_active_on=yesterday, then=F('current_streak') + 1),
+        default=Value(1),
+    )
+    missing = []
+    for user_id, delta in seconds.items():
+        if delta <= 0 or not credit:
+            # Rollups shrank or were repaired: only the total moves
+            updated = UserLearningStats.objects.filter(user_id=user_id).update(
+                watched_seconds=Greatest(F('watched_seconds') + delta, Value(0.0)),
+            )
+        else:
+            if not UserDailyWatch.objects.filter(user_id=user_id, day=today).update(
+                watched_seconds=F('watched_seconds') + delta
+            ):
+                _, created = UserDailyWatch.objects.get_or_create(
+                    user_id=user_id, day=today, defaults={'watched_seconds': delta}
+                )
+                if not created:
+                    UserDailyWatch.objects.filter(user_id=user_id, day=today).update(
+                        watched_seconds=F('watched_seconds') + delta
+                    )
+            updated = UserLearningStats.objects.filter(user_id=user_id).update(
+                watched_seconds=F('watched_seconds') + delta,
+                current_streak=streak,
+                longest_streak=Greatest(F('longest_streak'), streak),
+                last_active_on=today,
+            )
+        if not updated:
+            missing.append(user_id)
+    if missing:
+        rebuild(missing)
+    invalidate(seconds)
+
+
+def rebuild(user_ids=None):
+    """Recompute snapshots from the rollup, follow and daily tables; returns rows written.
+
+    Days without a UserDailyWatch row are backfilled from VideoProgress,
+    crediting each row's watch time to its last_watched date.
+    """
+    users = User.objects.all() if user_ids is None else User.objects.filter(pk__in=user_ids)
+    user_ids = list(users.values_list('pk', flat=True))
+    if not user_ids:
+        return 0
+
+    backfill = (
+        VideoProgress.objects.filter(user_id__in=user_ids)
+        .annotate(day=TruncDate('last_watched'))
+        .order_by()
+        .values('user_id', 'day')
+        .annotate(watched=Sum('current_time'))
+    )
+    UserDailyWatch.objects.bulk_create(
+        [UserDailyWatch(user_id=row['user_id'], day=row['day'], watched_seconds=row['watched'] or 0) for row in backfill],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+
+    active_days = {}
+    for user_id, day in (
+        UserDailyWatch.objects.filter(user_id__in=user_ids, watched_seconds__gt=0)
+        .order_by('user_id', 'day')
+        .values_list('user_id', 'day')
+    ):
+        active_days.setdefault(user_id, []).append(day)
+
+    watched = dict(
+        UserChannelProgress.objects.filter(user_id__in=user_ids)
+        .order_by()
+        .values('user_id')
+        .annotate(total=Sum('watched_seconds'))
+        .values_list('user_id', 'total')
+    )
+    counts = {
+        row['user_id']: row
+        for row in RoadmapFollow.objects.filter(user_id__in=user_ids)
+        .order_by()
+        .values('user_id')
+        .annotate(following=Count('id'), completed=Count('id', filter=Q(completed_at__isnull=False)))
+    }
+    created = dict(
+        Roadmap.objects.filter(owner_id__in=user_ids)
+        .order_by()
+        .values('owner_id')
+        .annotate(n=Count('id'))
+        .values_list('owner_id', 'n')
+    )
+
+    snapshots = []
+    for user_id in user_ids:
+        current, longest, last_active_on = _streaks(active_days.get(user_id, []))
+        follow_counts = counts.get(user_id, {})
+        snapshots.append(UserLearningStats(
+            user_id=user_id,
+            created_count=created.get(user_id, 0),
+            following_count=follow_counts.get('following', 0),
+            completed_count=follow_counts.get('completed', 0),
+            watched_seconds=watched.get(user_id) or 0,
+            current_streak=current,
+            longest_streak=longest,
+            last_active_on=last_active_on,
+            updated_at=timezone.now(),
+        ))
+    UserLearningStats.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=[
+            'created_count', 'following_count', 'completed_count', 'watched_seconds',
+            'current_streak', 'longest_streak', 'last_active_on', 'updated_at',
+        ],
+        batch_size=500,
+    )
+    invalidate(user_ids)
+    return len(snapshots)
+
+
+# -------------------------
+# Read path
+# -------------------------
+def get_learning_stats(user):
+    """Dashboard stats and the last ACTIVITY_DAYS of watch time, cached per user"""
+    key = _cache_key(user.id)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    snapshot = UserLearningStats.objects.filter(user=user).first()
+    if snapshot is None:
+        rebuild([user.id])
+        snapshot = UserLearningStats.objects.get(user=user)
+
+    today = timezone.localdate()
+    start = today - timedelta(days=ACTIVITY_DAYS - 1)
+    per_day = dict(
+        UserDailyWatch.objects.filter(user=user, day__gte=start).values_list('day', 'watched_seconds')
+    )
+    # A streak is only current while the user watched today or yesterday
+    current_streak = snapshot.current_streak if snapshot.last_active_on and today - snapshot.last_active_on <= timedelta(days=1) else 0
+
+    daily = [
+        {'day': day, 'minutes': round(per_day.get(day, 0) / 60)}
+        for day in (start + timedelta(days=i) for i in range(ACTIVITY_DAYS))
+    ]
+    stats = {
+        'created_count': snapshot.created_count,
+        'following_count': snapshot.following_count,
+        'completed_count': snapshot.completed_count,
+        'completion_rate': int(snapshot.completed_count / snapshot.following_count * 100) if snapshot.following_count else 0,
+        'total_watched_hours': round(snapshot.watched_seconds / 3600, 1),
+        'current_streak': current_streak,
+        'longest_streak': snapshot.longest_streak,
+        'last_active_on': snapshot.last_active_on,
+        'daily': daily,
+        'max_daily_minutes': max(max(entry['minutes'] for entry in daily), 1),
+    }
+    # Expire at midnight at the latest so the streak and the activity window roll over
+    midnight = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min))
+    ttl = min(getattr(settings, 'LEARNING_STATS_CACHE_TTL', 300), int((midnight - timezone.now()).total_seconds()) + 1)
+    cache.set(key, stats, ttl)
+    return stats
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from roadmaps.recommender import BUILD_CHUNK_SIZE, TOP_NEIGHBOURS, build_similarities
+
+
+class Command(BaseCommand):
+    help = 'Recompute the roadmap neighbour table used by roadmap_recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-n', type=int, default=TOP_NEIGHBOURS, help='Neighbours kept per roadmap')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=BUILD_CHUNK_SIZE, help='Roadmaps per work unit')
+
+    def handle(self, *args, **options):
+        written = build_similarities(
+            top_n=options['top_n'], workers=options['workers'], chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} roadmap neighbour pairs'))
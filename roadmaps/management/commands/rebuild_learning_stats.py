@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from roadmaps import learning_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild UserLearningStats snapshots and backfill missing daily watch time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int, help='Users to rebuild (default: all)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids'] or list(User.objects.order_by('pk').values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+
+        rebuilt = 0
+        for start in range(0, len(user_ids), chunk_size):
+            rebuilt += learning_stats.rebuild(user_ids[start:start + chunk_size])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt learning stats for {rebuilt} users'))
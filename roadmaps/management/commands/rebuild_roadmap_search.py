@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from roadmaps import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 roadmap search index and drop cached facet counts'
+
+    def handle(self, *args, **options):
+        if not search.fts_enabled():
+            raise CommandError('The full-text search index requires SQLite with FTS5')
+        total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} roadmaps'))
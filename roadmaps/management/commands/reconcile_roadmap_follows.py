@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from roadmaps.models import RoadmapFollow
+from roadmaps.progress import advance_follows
+
+
+class Command(BaseCommand):
+    help = 'Advance RoadmapFollow progress that the completion write path missed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        follows = RoadmapFollow.objects.filter(completed_at__isnull=True).order_by('pk')
+
+        last_pk = 0
+        checked = advanced = 0
+        while True:
+            chunk = list(follows.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            checked += len(chunk)
+            advanced += len(advance_follows(chunk))
+
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} open follows, advanced {advanced}'))
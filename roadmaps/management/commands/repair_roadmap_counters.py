@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from roadmaps import counters
+from roadmaps.models import Roadmap
+
+
+class Command(BaseCommand):
+    help = 'Recompute Roadmap follower/channel counts and the estimated_hours/video_count totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roadmap_ids', nargs='*', type=int, help='Roadmaps to repair (default: all)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        roadmap_ids = options['roadmap_ids'] or list(Roadmap.objects.order_by('pk').values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+
+        repaired = 0
+        for start in range(0, len(roadmap_ids), chunk_size):
+            chunk = roadmap_ids[start:start + chunk_size]
+            repaired += counters.repair(chunk)
+            counters.refresh_totals(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired counters for {repaired} roadmaps'))
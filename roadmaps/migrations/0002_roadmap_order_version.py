@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmaps', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roadmap',
+            name='order_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
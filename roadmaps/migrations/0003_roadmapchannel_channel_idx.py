@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0006_channel_learner_count'),
+        ('roadmaps', '0002_roadmap_order_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roadmapchannel',
+            index=models.Index(fields=['channel', 'roadmap', 'order'], name='roadmapchannel_channel_idx'),
+        ),
+    ]
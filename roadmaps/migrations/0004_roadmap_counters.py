@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Roadmap = apps.get_model('roadmaps', 'Roadmap')
+    RoadmapChannel = apps.get_model('roadmaps', 'RoadmapChannel')
+    RoadmapFollow = apps.get_model('roadmaps', 'RoadmapFollow')
+    for field, model in (('follower_count', RoadmapFollow), ('channel_count', RoadmapChannel)):
+        for row in model.objects.order_by().values('roadmap_id').annotate(count=Count('id')):
+            Roadmap.objects.filter(pk=row['roadmap_id']).update(**{field: row['count']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmaps', '0003_roadmapchannel_channel_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roadmap',
+            name='channel_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='roadmap',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='roadmap',
+            index=models.Index(fields=['-follower_count', '-id'], name='roadmap_followers_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roadmap',
+            index=models.Index(fields=['difficulty', '-follower_count'], name='roadmap_difficulty_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmaps', '0004_roadmap_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoadmapSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('roadmap', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_roadmaps', to='roadmaps.roadmap')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='roadmaps.roadmap')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['roadmap', '-score'], name='roadmap_similarity_idx')],
+                'unique_together': {('roadmap', 'similar')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmaps', '0005_roadmap_similarity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roadmap',
+            index=models.Index(fields=['-created_at', '-id'], name='roadmap_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    # rowid is the roadmap id, so the table joins straight onto roadmaps_roadmap
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS roadmaps_search_index USING fts5("
+        "title, description, owner, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO roadmaps_search_index (rowid, title, description, owner) "
+        "SELECT r.id, r.title, r.description, u.username "
+        "FROM roadmaps_roadmap r JOIN auth_user u ON u.id = r.owner_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS roadmaps_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmaps', '0006_roadmap_recent_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
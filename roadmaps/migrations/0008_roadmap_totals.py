@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Ceil, Coalesce
+
+
+def populate_totals(apps, schema_editor):
+    Roadmap = apps.get_model('roadmaps', 'Roadmap')
+    RoadmapChannel = apps.get_model('roadmaps', 'RoadmapChannel')
+
+    def channel_total(field):
+        return Coalesce(Subquery(
+            RoadmapChannel.objects.filter(roadmap_id=OuterRef('pk'))
+            .order_by()
+            .values('roadmap_id')
+            .annotate(value=Sum(field))
+            .values('value')[:1]
+        ), Value(0))
+
+    Roadmap.objects.update(
+        estimated_hours=Ceil(channel_total('channel__total_duration') / 3600.0),
+        video_count=channel_total('channel__video_count'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmaps', '0007_roadmap_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roadmap',
+            name='video_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='roadmap',
+            index=models.Index(fields=['estimated_hours'], name='roadmap_hours_idx'),
+        ),
+        migrations.RunPython(populate_totals, migrations.RunPython.noop),
+    ]
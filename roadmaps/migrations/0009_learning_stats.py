@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('roadmaps', '0008_roadmap_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserLearningStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='learning_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('following_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('watched_seconds', models.FloatField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('last_active_on', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserDailyWatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('watched_seconds', models.FloatField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_watch', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'day')},
+            },
+        ),
+    ]
@@ -13,20 +13,36 @@ class Roadmap(models.Model):
     description = models.TextField()
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_roadmaps')
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES, default='beginner')
-    estimated_hours = models.PositiveIntegerField(default=0)
     is_public = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     followers = models.ManyToManyField(User, through='RoadmapFollow', related_name='followed_roadmaps')
+    # Bumped by every channel reorder; clients send it back to detect concurrent edits
+    order_version = models.PositiveIntegerField(default=0)
+    # Maintained with F() by the follow/unfollow and add/remove channel views (roadmaps/counters.py)
+    follower_count = models.PositiveIntegerField(default=0)
+    channel_count = models.PositiveIntegerField(default=0)
+    # Rolled up from the channels' stored video aggregates (roadmaps/counters.py refresh_totals)
+    estimated_hours = models.PositiveIntegerField(default=0)
+    video_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-follower_count', '-id'], name='roadmap_followers_idx'),
+            models.Index(fields=['difficulty', '-follower_count'], name='roadmap_difficulty_idx'),
+            # Keyset pagination for the JSON API (roadmaps/api.py)
+            models.Index(fields=['-created_at', '-id'], name='roadmap_recent_idx'),
+            models.Index(fields=['estimated_hours'], name='roadmap_hours_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
     def total_channels(self):
-        return self.channels.count()
+        return self.channel_count
     
     def total_followers(self):
-        return self.followers.count()
+        return self.follower_count
 
 class RoadmapChannel(models.Model):
     roadmap = models.ForeignKey(Roadmap, on_delete=models.CASCADE, related_name='channels')
@@ -36,6 +52,10 @@ class RoadmapChannel(models.Model):
     class Meta:
         ordering = ['order']
         unique_together = ['roadmap', 'channel']
+        indexes = [
+            # Reverse lookup: which roadmaps contain a channel
+            models.Index(fields=['channel', 'roadmap', 'order'], name='roadmapchannel_channel_idx'),
+        ]
     
     def __str__(self):
         return f"{self.roadmap.title} - {self.channel.name}"
@@ -51,10 +71,55 @@ class RoadmapFollow(models.Model):
         unique_together = ['user', 'roadmap']
     
     def progress_percentage(self):
-        total_channels = self.roadmap.channels.count()
+        total_channels = self.roadmap.channel_count
         if total_channels == 0:
             return 0
         return int((self.current_channel_order / total_channels) * 100)
     
     def is_completed(self):
-        return self.completed_at is not None
\ No newline at end of file
+        return self.completed_at is not None
+
+
+class RoadmapSimilarity(models.Model):
+    """Top-N neighbours of a roadmap, written by ``manage.py build_roadmap_recommendations``"""
+    roadmap = models.ForeignKey(Roadmap, on_delete=models.CASCADE, related_name='similar_roadmaps')
+    similar = models.ForeignKey(Roadmap, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ['roadmap', 'similar']
+        indexes = [
+            models.Index(fields=['roadmap', '-score'], name='roadmap_similarity_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.roadmap_id} -> {self.similar_id} ({self.score:.3f})"
+
+
+class UserLearningStats(models.Model):
+    """Per-user dashboard snapshot, kept current by roadmaps/learning_stats.py"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='learning_stats')
+    created_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    watched_seconds = models.FloatField(default=0)
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_on = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} learning stats"
+
+
+class UserDailyWatch(models.Model):
+    """Watch time a user added on one day; the source of streaks and activity charts"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_watch')
+    day = models.DateField()
+    watched_seconds = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'day']
+
+    def __str__(self):
+        return f"{self.user.username} {self.day}: {self.watched_seconds:.0f}s"
@@ -0,0 +1,196 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from videos.models import UserChannelProgress
+from . import learning_stats
+from .models import RoadmapChannel, RoadmapFollow
+
+
+def _empty_progress():
+    return {
+        'channels_with_progress': [],
+        'overall_progress': 0,
+        'total_completed_videos': 0,
+        'total_videos': 0,
+        'total_watched_hours': 0,
+    }
+
+
+def get_roadmap_progress(pairs):
+    """Progress for many ``(user_id, roadmap_id)`` pairs in two queries.
+
+    One query loads the ordered channels (with their stored video counts) of
+    every roadmap involved, another the users' per-channel completed counts and
+    watched seconds from the UserChannelProgress rollups. ``user_id`` may be
+    None for anonymous visitors. Returns ``{(user_id, roadmap_id): data}`` where
+    ``data`` has the shape the roadmap templates expect.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    channels_by_roadmap = defaultdict(list)
+    for roadmap_channel in (
+        RoadmapChannel.objects.filter(roadmap_id__in={roadmap_id for _, roadmap_id in pairs})
+        .select_related('channel')
+        .order_by('roadmap_id', 'order', 'id')
+    ):
+        channels_by_roadmap[roadmap_channel.roadmap_id].append(roadmap_channel)
+
+    rollups = {}
+    user_ids = {user_id for user_id, _ in pairs if user_id is not None}
+    if user_ids:
+        channel_ids = {rc.channel_id for rcs in channels_by_roadmap.values() for rc in rcs}
+        rollups = {
+            (user_id, channel_id): (completed, watched)
+            for user_id, channel_id, completed, watched in UserChannelProgress.objects.filter(
+                user_id__in=user_ids, channel_id__in=channel_ids,
+            ).values_list('user_id', 'channel_id', 'completed_videos', 'watched_seconds')
+        }
+
+    results = {}
+    for user_id, roadmap_id in pairs:
+        data = _empty_progress()
+        total_watched_seconds = 0
+        for roadmap_channel in channels_by_roadmap.get(roadmap_id, []):
+            channel_total_videos = roadmap_channel.channel.video_count
+            completed, watched = rollups.get((user_id, roadmap_channel.channel_id), (0, 0))
+            completed = min(completed, channel_total_videos)
+
+            data['total_videos'] += channel_total_videos
+            data['total_completed_videos'] += completed
+            total_watched_seconds += watched
+            data['channels_with_progress'].append({
+                'roadmap_channel': roadmap_channel,
+                'progress': int((completed / channel_total_videos) * 100) if channel_total_videos > 0 else 0,
+                'completed_videos': completed,
+                'total_videos': channel_total_videos,
+                'watched_seconds': watched,
+            })
+
+        if data['total_videos']:
+            data['overall_progress'] = int((data['total_completed_videos'] / data['total_videos']) * 100)
+        data['total_watched_hours'] = round(total_watched_seconds / 3600, 1)
+        results[(user_id, roadmap_id)] = data
+    return results
+
+
+def calculate_roadmap_progress(roadmap, user):
+    """Calculate comprehensive progress data for roadmap"""
+    key = (user.id if user.is_authenticated else None, roadmap.id)
+    return get_roadmap_progress([key])[key]
+
+
+def advance_follows(follows):
+    """Move each follow's current_channel_order up to its completed prefix.
+
+    A roadmap channel counts as done once the user's UserChannelProgress for it
+    has ``completed_at``; the follow advances to the last channel of the
+    unbroken run of done channels from the start, and ``completed_at`` is set
+    when that run covers the whole roadmap. Like auto_update_progress, this
+    never moves a follow backwards. Uses two reads and one bulk update for any
+    number of follows; returns the follows that changed.
+    """
+    follows = list(follows)
+    if not follows:
+        return []
+
+    channels_by_roadmap = defaultdict(list)
+    for roadmap_id, channel_id, order in (
+        RoadmapChannel.objects.filter(roadmap_id__in={f.roadmap_id for f in follows})
+        .order_by('roadmap_id', 'order', 'id')
+        .values_list('roadmap_id', 'channel_id', 'order')
+    ):
+        channels_by_roadmap[roadmap_id].append((channel_id, order))
+
+    done = set(
+        UserChannelProgress.objects.filter(
+            user_id__in={f.user_id for f in follows},
+            channel_id__in={channel_id for rcs in channels_by_roadmap.values() for channel_id, _ in rcs},
+            completed_at__isnull=False,
+        ).values_list('user_id', 'channel_id')
+    )
+
+    current = timezone.now()
+    changed = []
+    for follow in follows:
+        roadmap_channels = channels_by_roadmap.get(follow.roadmap_id, [])
+        reached, finished = 0, bool(roadmap_channels)
+        for channel_id, order in roadmap_channels:
+            if (follow.user_id, channel_id) not in done:
+                finished = False
+                break
+            reached = order
+
+        if reached > follow.current_channel_order or (finished and follow.completed_at is None):
+            follow.current_channel_order = max(reached, follow.current_channel_order)
+            if finished and follow.completed_at is None:
+                follow.completed_at = current
+            changed.append(follow)
+
+    if changed:
+        with transaction.atomic():
+            RoadmapFollow.objects.bulk_update(changed, ['current_channel_order', 'completed_at'])
+        # bulk_update sends no signals, so recount completions here
+        learning_stats.refresh_counts({follow.user_id for follow in changed if follow.completed_at == current})
+    return changed
+
+
+def advance_follows_for_channels(pairs):
+    """Advance the follows touched by newly completed ``(user_id, channel_id)`` pairs"""
+    pairs = set(pairs)
+    user_ids = {user_id for user_id, _ in pairs}
+    roadmaps_by_channel = defaultdict(set)
+    for channel_id, roadmap_id in RoadmapChannel.objects.filter(
+        channel_id__in={channel_id for _, channel_id in pairs}
+    ).values_list('channel_id', 'roadmap_id'):
+        roadmaps_by_channel[channel_id].add(roadmap_id)
+
+    wanted = {
+        (user_id, roadmap_id)
+        for user_id, channel_id in pairs
+        for roadmap_id in roadmaps_by_channel.get(channel_id, ())
+    }
+    if not wanted:
+        return []
+
+    follows = RoadmapFollow.objects.filter(
+        user_id__in=user_ids,
+        roadmap_id__in={roadmap_id for _, roadmap_id in wanted},
+        completed_at__isnull=True,
+    )
+    return advance_follows(f for f in follows if (f.user_id, f.roadmap_id) in wanted)
+
+
+def remap_follow_orders(roadmap_id, old_orders):
+    """Carry follows' current_channel_order across a renumbering of a roadmap's channels.
+
+    ``old_orders`` maps channel id to its order before the change. Each follow
+    keeps pointing at the same channel (the last one at or before its old
+    order) under the new numbering, in one CASE UPDATE. Call it in the
+    transaction that renumbered the channels.
+    """
+    follows = RoadmapFollow.objects.filter(roadmap_id=roadmap_id, current_channel_order__gt=0)
+    values = set(follows.values_list('current_channel_order', flat=True))
+    if not values:
+        return 0
+
+    new_orders = dict(RoadmapChannel.objects.filter(roadmap_id=roadmap_id).values_list('channel_id', 'order'))
+    before = sorted((order, channel_id) for channel_id, order in old_orders.items())
+    positions = [order for order, _ in before]
+    changed = {}
+    for value in values:
+        index = bisect_right(positions, value)
+        new_value = new_orders.get(before[index - 1][1], 0) if index else 0
+        if new_value != value:
+            changed[value] = new_value
+    if not changed:
+        return 0
+    return follows.filter(current_channel_order__in=list(changed)).update(current_channel_order=Case(
+        *[When(current_channel_order=old, then=Value(new)) for old, new in changed.items()],
+        output_field=PositiveIntegerField(),
+    ))
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Roadmap, RoadmapChannel, RoadmapFollow, RoadmapSimilarity
+from .similarity import init_worker, invert, top_neighbours, worker_top_neighbours
+
+# Neighbours stored per roadmap
+TOP_NEIGHBOURS = 20
+
+# Roadmaps per unit of work handed to a worker process
+BUILD_CHUNK_SIZE = 200
+
+
+def _load_incidence():
+    public_ids = set(Roadmap.objects.filter(is_public=True).values_list('id', flat=True))
+    followers_of, channels_of = {}, {}
+    for roadmap_id, user_id in RoadmapFollow.objects.filter(roadmap_id__in=public_ids).values_list('roadmap_id', 'user_id').iterator(chunk_size=5000):
+        followers_of.setdefault(roadmap_id, set()).add(user_id)
+    for roadmap_id, channel_id in RoadmapChannel.objects.filter(roadmap_id__in=public_ids).values_list('roadmap_id', 'channel_id').iterator(chunk_size=5000):
+        channels_of.setdefault(roadmap_id, set()).add(channel_id)
+    return sorted(public_ids), followers_of, channels_of
+
+
+def build_similarities(top_n=TOP_NEIGHBOURS, workers=None, chunk_size=BUILD_CHUNK_SIZE):
+    """Recompute RoadmapSimilarity for every public roadmap.
+
+    Co-follow and shared-channel cosine similarities are computed from sparse
+    incidence sets, with roadmap chunks spread over ``workers`` processes
+    (default: one per CPU core). The table is replaced in one transaction.
+    Returns the number of rows written.
+    """
+    roadmap_ids, followers_of, channels_of = _load_incidence()
+    users_of, roadmaps_of = invert(followers_of), invert(channels_of)
+    chunks = [roadmap_ids[i:i + chunk_size] for i in range(0, len(roadmap_ids), chunk_size)]
+    args = (followers_of, users_of, channels_of, roadmaps_of, top_n)
+
+    workers = workers or os.cpu_count() or 1
+    neighbours = {}
+    if workers > 1 and len(chunks) > 1:
+        # The incidence sets are shipped to each worker once, not with every chunk
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=init_worker, initargs=args) as executor:
+            for partial in executor.map(worker_top_neighbours, chunks):
+                neighbours.update(partial)
+    else:
+        for chunk in chunks:
+            neighbours.update(top_neighbours(chunk, *args))
+
+    rows = [
+        RoadmapSimilarity(roadmap_id=roadmap_id, similar_id=similar_id, score=score)
+        for roadmap_id, pairs in neighbours.items()
+        for similar_id, score in pairs
+    ]
+    with transaction.atomic():
+        RoadmapSimilarity.objects.all().delete()
+        RoadmapSimilarity.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def recommend_for_user(user, limit=8):
+    """Public roadmaps most similar to the user's follows, best first.
+
+    One grouped query over the precomputed neighbour table, excluding roadmaps
+    the user already follows or owns. Empty for users with no follows.
+    """
+    followed = RoadmapFollow.objects.filter(user=user).values('roadmap_id')
+    ranked = list(
+        RoadmapSimilarity.objects.filter(roadmap_id__in=followed, similar__is_public=True)
+        .exclude(similar_id__in=followed)
+        .exclude(similar__owner=user)
+        .values('similar_id')
+        .annotate(total=Sum('score'))
+        .order_by('-total', 'similar_id')
+        .values_list('similar_id', flat=True)[:limit]
+    )
+    roadmaps = Roadmap.objects.select_related('owner').in_bulk(ranked)
+    return [roadmaps[roadmap_id] for roadmap_id in ranked if roadmap_id in roadmaps]
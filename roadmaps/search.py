@@ -0,0 +1,187 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+from home.search import build_match_query, fts_enabled
+from .models import Roadmap
+
+SEARCH_TABLE = 'roadmaps_search_index'
+GENERATION_KEY = 'roadmaps:search:generation'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# bm25 column weights: (title, description, owner)
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+# (key, label, lowest hours, highest hours or None)
+HOURS_BUCKETS = [
+    ('0-10', 'Under 10h', 0, 10),
+    ('11-25', '11-25h', 11, 25),
+    ('26-50', '26-50h', 26, 50),
+    ('50+', 'Over 50h', 51, None),
+]
+
+
+def normalize(query):
+    return ' '.join(_TOKEN_RE.findall(query.lower()))
+
+
+def hours_bucket(hours):
+    for key, _, low, high in HOURS_BUCKETS:
+        if hours >= low and (high is None or hours <= high):
+            return key
+
+
+def hours_filter(key):
+    """Q for an ``hours`` bucket key, or None if the key is unknown"""
+    for bucket, _, low, high in HOURS_BUCKETS:
+        if bucket == key:
+            return Q(estimated_hours__gte=low) if high is None else Q(estimated_hours__range=(low, high))
+    return None
+
+
+# -------------------------
+# Index maintenance
+# -------------------------
+def index_roadmaps(roadmaps):
+    """(Re)index roadmaps; each needs ``owner`` loaded or loadable"""
+    if not fts_enabled() or not roadmaps:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(r.pk,) for r in roadmaps])
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, owner) VALUES (%s, %s, %s, %s)',
+            [(r.pk, r.title, r.description, r.owner.username) for r in roadmaps],
+        )
+    bump_generation()
+
+
+def remove_from_index(roadmap_ids):
+    if not fts_enabled() or not roadmap_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(pk,) for pk in roadmap_ids])
+    bump_generation()
+
+
+def rebuild_index():
+    """Repopulate the whole index from the Roadmap table in one statement"""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, owner) '
+            'SELECT r.id, r.title, r.description, u.username '
+            'FROM roadmaps_roadmap r JOIN auth_user u ON u.id = r.owner_id'
+        )
+        total = cursor.rowcount
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    bump_generation()
+    return total
+
+
+def bump_generation():
+    """Invalidate all cached facet counts"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
+
+
+# -------------------------
+# Querying
+# -------------------------
+def matching(queryset, query):
+    """Restrict a Roadmap queryset to rows matching ``query`` in title, description or owner.
+
+    A query with no searchable terms (only punctuation or operators) matches nothing.
+    """
+    if not has_terms(query):
+        return queryset.none()
+    if not fts_enabled():
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(owner__username__icontains=query)
+        )
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.rowid = roadmaps_roadmap.id', f'{SEARCH_TABLE} MATCH %s'],
+        params=[match],
+    )
+
+
+def has_terms(query):
+    """True if ``query`` holds anything to match; punctuation-only input does not"""
+    return bool(normalize(query or ''))
+
+
+def by_relevance(queryset):
+    """Order a ``matching()`` queryset by bm25, best first; only valid when has_terms(query)"""
+    if not fts_enabled():
+        return queryset.order_by('-follower_count', '-id')
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    return queryset.extra(select={'relevance': f'bm25({SEARCH_TABLE}, {weights})'}).order_by('relevance', '-id')
+
+
+def _facet_cells(query, max_hours=None):
+    """``{(difficulty, hours bucket): count}`` over public roadmaps matching ``query``, in one grouped query"""
+    queryset = Roadmap.objects.filter(is_public=True)
+    if query:
+        queryset = matching(queryset, query)
+    if max_hours is not None:
+        queryset = queryset.filter(estimated_hours__lte=max_hours)
+    rows = queryset.order_by().values_list('difficulty', 'estimated_hours').annotate(n=Count('id'))
+    cells = {}
+    for difficulty, hours, n in rows:
+        key = (difficulty, hours_bucket(hours))
+        cells[key] = cells.get(key, 0) + n
+    return cells
+
+
+def get_facets(query, difficulty=None, hours=None, max_hours=None):
+    """Facet counts for a search, each ignoring its own selection.
+
+    The (difficulty, hours bucket) grid is cached per normalized query and
+    ``max_hours`` cap; the counts for the current selection are then read
+    off it without a query.
+    """
+    normalized = normalize(query or '')[:100]
+    if query and not normalized:
+        # Nothing to match, so every facet is empty like the results
+        cells = {}
+    else:
+        generation = cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+        digest = hashlib.md5(normalized.encode()).hexdigest()
+        cache_key = f'roadmaps:facets:{generation}:{max_hours}:{digest}'
+        cells = cache.get(cache_key)
+        if cells is None:
+            cells = _facet_cells(normalized, max_hours)
+            cache.set(cache_key, cells, getattr(settings, 'ROADMAP_SEARCH_CACHE_TTL', 300))
+
+    difficulty_counts = {key: 0 for key, _ in Roadmap.DIFFICULTY_CHOICES}
+    hours_counts = {key: 0 for key, *_ in HOURS_BUCKETS}
+    for (cell_difficulty, cell_hours), n in cells.items():
+        if hours is None or cell_hours == hours:
+            difficulty_counts[cell_difficulty] = difficulty_counts.get(cell_difficulty, 0) + n
+        if difficulty is None or cell_difficulty == difficulty:
+            hours_counts[cell_hours] += n
+
+    return {
+        'difficulty': [
+            {'value': key, 'label': label, 'count': difficulty_counts[key], 'selected': key == difficulty}
+            for key, label in Roadmap.DIFFICULTY_CHOICES
+        ],
+        'hours': [
+            {'value': key, 'label': label, 'count': hours_counts[key], 'selected': key == hours}
+            for key, label, *_ in HOURS_BUCKETS
+        ],
+    }
+
@@ -0,0 +1,70 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from channels.models import Channel
+from videos.aggregates import channel_totals_changed
+from videos.models import UserChannelProgress
+from videos.progress import channels_completed, watch_time_added
+from . import counters, learning_stats, search
+from .categories import invalidate_categories
+from .models import Roadmap, RoadmapChannel, RoadmapFollow
+from .progress import advance_follows_for_channels
+
+
+@receiver(channels_completed, sender=UserChannelProgress)
+def advance_roadmaps_on_channel_completion(sender, pairs, **kwargs):
+    advance_follows_for_channels(pairs)
+
+
+@receiver(post_save, sender=Roadmap)
+@receiver(post_delete, sender=Roadmap)
+@receiver(post_save, sender=RoadmapFollow)
+@receiver(post_delete, sender=RoadmapFollow)
+def invalidate_roadmap_categories(sender, **kwargs):
+    invalidate_categories()
+
+
+@receiver(post_save, sender=Roadmap)
+def index_roadmap(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_roadmaps([instance])
+
+
+@receiver(post_delete, sender=Roadmap)
+def unindex_roadmap(sender, instance, **kwargs):
+    search.remove_from_index([instance.pk])
+
+
+@receiver(channel_totals_changed, sender=Channel)
+def refresh_roadmap_totals_for_channels(sender, channel_ids, **kwargs):
+    counters.refresh_totals_for_channels(channel_ids)
+
+
+@receiver(post_save, sender=RoadmapChannel)
+@receiver(post_delete, sender=RoadmapChannel)
+def refresh_roadmap_totals(sender, instance, raw=False, **kwargs):
+    if not raw:
+        counters.refresh_totals([instance.roadmap_id])
+
+
+@receiver(watch_time_added, sender=UserChannelProgress)
+def record_watch_time(sender, seconds, credit=True, **kwargs):
+    learning_stats.add_watch_time(seconds, credit=credit)
+
+
+@receiver(post_save, sender=Roadmap)
+def count_created_roadmap(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        learning_stats.refresh_counts([instance.owner_id])
+
+
+@receiver(post_delete, sender=Roadmap)
+def uncount_created_roadmap(sender, instance, **kwargs):
+    learning_stats.refresh_counts([instance.owner_id])
+
+
+@receiver(post_save, sender=RoadmapFollow)
+@receiver(post_delete, sender=RoadmapFollow)
+def recount_follows(sender, instance, raw=False, **kwargs):
+    if not raw:
+        learning_stats.refresh_counts([instance.user_id])
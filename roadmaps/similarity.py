@@ -0,0 +1,64 @@
+"""Item-item similarity over sparse incidence sets.
+
+Kept free of Django imports so worker processes can import it without
+setting up the ORM; roadmaps/recommender.py feeds it plain dicts.
+"""
+import heapq
+from math import sqrt
+
+# Weight of each signal in the blended score
+FOLLOW_WEIGHT = 0.7
+CHANNEL_WEIGHT = 0.3
+
+
+def _cosine_row(item, members_of, items_of):
+    """Cosine similarity of ``item`` to every item sharing a member with it.
+
+    ``members_of`` maps item -> set of members (followers or channels) and
+    ``items_of`` is the inverted index member -> items. Walking the inverted
+    index touches only the non-zero entries of row ``item`` of A·Aᵀ.
+    """
+    members = members_of.get(item)
+    if not members:
+        return {}
+    overlap = {}
+    for member in members:
+        for other in items_of[member]:
+            if other != item:
+                overlap[other] = overlap.get(other, 0) + 1
+    norm = len(members)
+    return {other: shared / sqrt(norm * len(members_of[other])) for other, shared in overlap.items()}
+
+
+def top_neighbours(items, followers_of, users_of, channels_of, roadmaps_of, top_n):
+    """Return ``{item: [(neighbour, score), ...]}`` with at most ``top_n`` neighbours each"""
+    result = {}
+    for item in items:
+        scores = {}
+        for other, sim in _cosine_row(item, followers_of, users_of).items():
+            scores[other] = FOLLOW_WEIGHT * sim
+        for other, sim in _cosine_row(item, channels_of, roadmaps_of).items():
+            scores[other] = scores.get(other, 0) + CHANNEL_WEIGHT * sim
+        result[item] = heapq.nlargest(top_n, scores.items(), key=lambda pair: (pair[1], -pair[0]))
+    return result
+
+
+def invert(members_of):
+    items_of = {}
+    for item, members in members_of.items():
+        for member in members:
+            items_of.setdefault(member, []).append(item)
+    return items_of
+
+
+# Incidence data installed once per worker process by init_worker()
+_worker_args = None
+
+
+def init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def worker_top_neighbours(items):
+    return top_neighbours(items, *_worker_args)
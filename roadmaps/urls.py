@@ -12,6 +12,7 @@ urlpatterns = [
     path('<int:pk>/delete/', views.RoadmapDeleteView.as_view(), name='delete'),
     
     path('<int:roadmap_id>/add-channel/', views.add_channel_to_roadmap, name='add_channel'),
+    path('<int:roadmap_id>/reorder/', views.reorder_roadmap_channels, name='reorder_channels'),
     path('<int:roadmap_id>/remove-channel/<int:channel_id>/', views.remove_channel_from_roadmap, name='remove_channel'),
     
     path('<int:roadmap_id>/follow/', views.follow_roadmap, name='follow'),
@@ -25,4 +26,5 @@ urlpatterns = [
     path('stats/', views.roadmap_stats, name='stats'),
     
     path('api/list/', views.api_roadmap_list, name='api_list'),
+    path('api/v1/roadmaps/', views.api_v1_roadmaps, name='api_v1_roadmaps'),
 ]
\ No newline at end of file
@@ -1,80 +1,26 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
-from django.db.models import Count, Q, Sum, Prefetch
+from django.db.models import Count
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 from .models import Roadmap, RoadmapChannel, RoadmapFollow
 from channels.models import Channel
-from videos.models import Video, VideoProgress
 from .forms import RoadmapForm, RoadmapChannelForm
-
-
-def calculate_roadmap_progress(roadmap, user):
-    """Calculate comprehensive progress data for roadmap"""
-    channels_with_progress = []
-    total_completed_videos = 0
-    total_videos = 0
-    total_watched_seconds = 0
-    
-    # Get user's video progress for all videos in roadmap
-    user_video_progress = {}
-    if user.is_authenticated:
-        video_ids = [video.id for channel in roadmap.channels.all() for video in channel.channel.videos.all()]
-        progress_objects = VideoProgress.objects.filter(
-            user=user, 
-            video_id__in=video_ids
-        ).values('video_id', 'current_time', 'watched_percentage')
-        
-        for progress in progress_objects:
-            user_video_progress[progress['video_id']] = progress
-    
-    for roadmap_channel in roadmap.channels.all():
-        channel = roadmap_channel.channel
-        videos = channel.videos.all()
-        channel_total_videos = videos.count()
-        total_videos += channel_total_videos
-        
-        # Calculate channel progress
-        completed_videos = 0
-        channel_watched_seconds = 0
-        
-        for video in videos:
-            progress = user_video_progress.get(video.id)
-            if progress and progress['watched_percentage'] >= 95:
-                completed_videos += 1
-            if progress:
-                channel_watched_seconds += progress['current_time']
-        
-        total_completed_videos += completed_videos
-        total_watched_seconds += channel_watched_seconds
-        
-        channel_progress = int((completed_videos / channel_total_videos) * 100) if channel_total_videos > 0 else 0
-        
-        channels_with_progress.append({
-            'roadmap_channel': roadmap_channel,
-            'progress': channel_progress,
-            'completed_videos': completed_videos,
-            'total_videos': channel_total_videos,
-            'watched_seconds': channel_watched_seconds,
-        })
-    
-    # Calculate overall progress
-    overall_progress = int((total_completed_videos / total_videos) * 100) if total_videos > 0 else 0
-    total_watched_hours = total_watched_seconds / 3600
-    
-    return {
-        'channels_with_progress': channels_with_progress,
-        'overall_progress': overall_progress,
-        'total_completed_videos': total_completed_videos,
-        'total_videos': total_videos,
-        'total_watched_hours': round(total_watched_hours, 1),
-    }
+from . import api, counters, search
+from .filters import filter_roadmaps
+from .categories import get_categories
+from .learning_stats import get_learning_stats
+from .recommender import recommend_for_user
+from .progress import advance_follows, calculate_roadmap_progress, get_roadmap_progress, remap_follow_orders
+from videos.ordering import ReorderError, VersionConflict, apply_reorder, parse_reorder_payload
 
 
 class RoadmapListView(ListView):
@@ -85,27 +31,13 @@ class RoadmapListView(ListView):
     
     def get_queryset(self):
         queryset = Roadmap.objects.filter(is_public=True).select_related('owner')
+        queryset = filter_roadmaps(queryset, self.request.GET)
         
-        # Search
-        search_query = self.request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(owner__username__icontains=search_query)
-            )
-        
-        # Filters
-        difficulty = self.request.GET.get('difficulty')
-        if difficulty in ['beginner', 'intermediate', 'advanced']:
-            queryset = queryset.filter(difficulty=difficulty)
-        
-        max_hours = self.request.GET.get('max_hours')
-        if max_hours and max_hours.isdigit():
-            queryset = queryset.filter(estimated_hours__lte=int(max_hours))
+        # Ordering: relevance by default while searching
+        order_by = self.get_order_by()
+        if order_by == 'relevance' and search.has_terms(self.request.GET.get('search')):
+            return search.by_relevance(queryset)
         
-        # Ordering
-        order_by = self.request.GET.get('order_by', '-created_at')
         ordering_map = {
             'title': 'title',
             '-title': '-title',
@@ -115,21 +47,31 @@ class RoadmapListView(ListView):
         }
         
         if order_by in ordering_map:
-            if order_by == 'followers':
-                queryset = queryset.annotate(follower_count=Count('followers'))
             queryset = queryset.order_by(ordering_map[order_by])
         else:
             queryset = queryset.order_by('-created_at')
         
         return queryset
     
+    def get_order_by(self):
+        searching = search.has_terms(self.request.GET.get('search'))
+        return self.request.GET.get('order_by') or ('relevance' if searching else '-created_at')
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        max_hours = self.request.GET.get('max_hours', '')
         context.update({
             'search_query': self.request.GET.get('search', ''),
             'selected_difficulty': self.request.GET.get('difficulty', ''),
-            'selected_max_hours': self.request.GET.get('max_hours', ''),
-            'order_by': self.request.GET.get('order_by', '-created_at'),
+            'selected_max_hours': max_hours,
+            'selected_hours': self.request.GET.get('hours', ''),
+            'order_by': self.get_order_by(),
+            'facets': search.get_facets(
+                self.request.GET.get('search', ''),
+                difficulty=self.request.GET.get('difficulty') or None,
+                hours=self.request.GET.get('hours') or None,
+                max_hours=int(max_hours) if max_hours.isdigit() else None,
+            ),
         })
         return context
 
@@ -140,10 +82,7 @@ class RoadmapDetailView(DetailView):
     context_object_name = 'roadmap'
     
     def get_queryset(self):
-        return Roadmap.objects.select_related('owner').prefetch_related(
-            Prefetch('channels', queryset=RoadmapChannel.objects.select_related('channel').order_by('order')),
-            'channels__channel__videos'
-        )
+        return Roadmap.objects.select_related('owner')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -225,13 +164,19 @@ def add_channel_to_roadmap(request, roadmap_id):
             roadmap_channel = form.save(commit=False)
             roadmap_channel.roadmap = roadmap
             
-            # Check for duplicate order
-            if RoadmapChannel.objects.filter(roadmap=roadmap, order=roadmap_channel.order).exists():
-                messages.error(request, 'A channel with this order already exists.')
-            else:
+            # Inserting at a taken order shifts that channel and the ones after it down
+            with transaction.atomic():
+                old_orders = dict(roadmap.channels.values_list('channel_id', 'order'))
+                shifted = RoadmapChannel.objects.filter(
+                    roadmap=roadmap, order__gte=roadmap_channel.order
+                ).update(order=models.F('order') + 1)
+                if shifted:
+                    Roadmap.objects.filter(pk=roadmap.pk).update(order_version=models.F('order_version') + 1)
+                    remap_follow_orders(roadmap.id, old_orders)
                 roadmap_channel.save()
-                messages.success(request, f'Channel "{roadmap_channel.channel.name}" added successfully!')
-                return redirect('roadmaps:detail', pk=roadmap_id)
+                counters.adjust(roadmap.id, channels=1)
+            messages.success(request, f'Channel "{roadmap_channel.channel.name}" added successfully!')
+            return redirect('roadmaps:detail', pk=roadmap_id)
     else:
         form = RoadmapChannelForm()
         # Set available channels and suggest next order
@@ -253,7 +198,9 @@ def remove_channel_from_roadmap(request, roadmap_id, channel_id):
     
     if request.method == 'POST':
         channel_name = roadmap_channel.channel.name
-        roadmap_channel.delete()
+        with transaction.atomic():
+            roadmap_channel.delete()
+            counters.adjust(roadmap.id, channels=-1)
         messages.success(request, f'Channel "{channel_name}" removed successfully!')
         return redirect('roadmaps:detail', pk=roadmap_id)
     
@@ -263,15 +210,43 @@ def remove_channel_from_roadmap(request, roadmap_id, channel_id):
     })
 
 
+@login_required
+def reorder_roadmap_channels(request, roadmap_id):
+    """Reorder a roadmap's channels (identified by channel id) from a full ordering or a move"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    roadmap = get_object_or_404(Roadmap, id=roadmap_id, owner=request.user)
+
+    try:
+        payload = parse_reorder_payload(request.body)
+        with transaction.atomic():
+            # Followers' positions are order numbers; keep them on the same channels
+            old_orders = dict(roadmap.channels.values_list('channel_id', 'order'))
+            ordering, version = apply_reorder(
+                Roadmap.objects.filter(pk=roadmap.pk), RoadmapChannel.objects.filter(roadmap=roadmap), 'channel_id', payload,
+            )
+            remap_follow_orders(roadmap.id, old_orders)
+    except ReorderError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except VersionConflict:
+        roadmap.refresh_from_db(fields=['order_version'])
+        return JsonResponse({'error': 'The channels were reordered by someone else', 'version': roadmap.order_version}, status=409)
+
+    return JsonResponse({'status': 'success', 'version': version, 'order': ordering})
+
+
 @login_required
 def follow_roadmap(request, roadmap_id):
     roadmap = get_object_or_404(Roadmap, id=roadmap_id, is_public=True)
     
     if request.method == 'POST':
-        follow, created = RoadmapFollow.objects.get_or_create(
-            user=request.user, 
-            roadmap=roadmap
-        )
+        with transaction.atomic():
+            follow, created = RoadmapFollow.objects.get_or_create(
+                user=request.user, 
+                roadmap=roadmap
+            )
+            if created:
+                counters.adjust(roadmap.id, followers=1)
         if created:
             messages.success(request, f'You are now following "{roadmap.title}"!')
         else:
@@ -287,7 +262,9 @@ def unfollow_roadmap(request, roadmap_id):
     roadmap = get_object_or_404(Roadmap, id=roadmap_id)
     
     if request.method == 'POST':
-        deleted_count, _ = RoadmapFollow.objects.filter(user=request.user, roadmap=roadmap).delete()
+        with transaction.atomic():
+            deleted_count, _ = RoadmapFollow.objects.filter(user=request.user, roadmap=roadmap).delete()
+            counters.adjust(roadmap.id, followers=-deleted_count)
         if deleted_count:
             messages.success(request, f'You have unfollowed "{roadmap.title}"')
         else:
@@ -301,34 +278,18 @@ def unfollow_roadmap(request, roadmap_id):
 @login_required
 def my_roadmaps(request):
     """User's dashboard for created and followed roadmaps"""
-    created_roadmaps = Roadmap.objects.filter(owner=request.user).annotate(
-        channel_count=Count('channels'),
-        follower_count=Count('followers')
-    ).order_by('-created_at')
-    
-    roadmap_follows = RoadmapFollow.objects.filter(user=request.user).select_related('roadmap')
-    
-    # Calculate progress for followed roadmaps
-    followed_with_progress = []
-    for follow in roadmap_follows:
-        progress_data = calculate_roadmap_progress(follow.roadmap, request.user)
-        followed_with_progress.append({
-            'follow': follow,
-            'progress_data': progress_data
-        })
+    created_roadmaps = list(Roadmap.objects.filter(owner=request.user).order_by('-created_at'))
+    
+    roadmap_follows = list(RoadmapFollow.objects.filter(user=request.user).select_related('roadmap__owner'))
     
-    # Calculate total watched time
-    total_watched = VideoProgress.objects.filter(user=request.user).aggregate(
-        total=Sum('current_time')
-    )['total'] or 0
-    total_watched_hours = round(total_watched / 3600, 1)
+    # Progress for every followed roadmap in one batch
+    progress = get_roadmap_progress((request.user.id, follow.roadmap_id) for follow in roadmap_follows)
+    followed_with_progress = [
+        {'follow': follow, 'progress_data': progress[(request.user.id, follow.roadmap_id)]}
+        for follow in roadmap_follows
+    ]
     
-    stats = {
-        'created_count': created_roadmaps.count(),
-        'following_count': roadmap_follows.count(),
-        'completed_count': roadmap_follows.filter(completed_at__isnull=False).count(),
-        'total_watched_hours': total_watched_hours,
-    }
+    stats = get_learning_stats(request.user)
     
     return render(request, 'roadmaps/my_roadmaps.html', {
         'created_roadmaps': created_roadmaps,
@@ -348,15 +309,15 @@ def update_roadmap_progress(request, roadmap_id):
             action = request.POST.get('action')
             
             if action == 'next':
-                follow.current_channel_order = min(follow.current_channel_order + 1, roadmap.channels.count())
+                follow.current_channel_order = min(follow.current_channel_order + 1, roadmap.channel_count)
             elif action == 'prev':
                 follow.current_channel_order = max(follow.current_channel_order - 1, 0)
             elif action == 'set':
                 channel_order = int(request.POST.get('channel_order', 0))
-                follow.current_channel_order = min(channel_order, roadmap.channels.count())
+                follow.current_channel_order = min(channel_order, roadmap.channel_count)
             
             # Check completion
-            if follow.current_channel_order >= roadmap.channels.count():
+            if follow.current_channel_order >= roadmap.channel_count:
                 follow.completed_at = timezone.now()
                 messages.success(request, f'🎉 Congratulations! You completed "{roadmap.title}"!')
             else:
@@ -380,27 +341,10 @@ def auto_update_progress(request, roadmap_id):
     
     try:
         follow = RoadmapFollow.objects.get(user=request.user, roadmap=roadmap)
-        progress_data = calculate_roadmap_progress(roadmap, request.user)
-        
-        # Find the highest completed channel based on video progress
-        highest_completed_order = 0
-        for channel_data in progress_data['channels_with_progress']:
-            if channel_data['progress'] == 100:  # Channel fully completed
-                highest_completed_order = channel_data['roadmap_channel'].order
-            else:
-                break  # Stop at first incomplete channel
-        
-        if highest_completed_order > follow.current_channel_order:
-            follow.current_channel_order = highest_completed_order
-            
-            # Check if roadmap is completed
-            if follow.current_channel_order >= roadmap.channels.count():
-                follow.completed_at = timezone.now()
+        # Normally done by the progress write path already; this catches up anything it missed
+        if advance_follows([follow]):
+            if follow.completed_at:
                 messages.success(request, f'🎉 Congratulations! You completed "{roadmap.title}"!')
-            else:
-                follow.completed_at = None
-            
-            follow.save()
             messages.success(request, 'Progress auto-updated based on video completion!')
         else:
             messages.info(request, 'No new progress to update based on your video completion.')
@@ -414,12 +358,7 @@ def auto_update_progress(request, roadmap_id):
 @login_required
 def roadmap_recommendations(request):
     """Get personalized roadmap recommendations"""
-    # Get excluded roadmaps (already followed or created)
-    excluded_ids = list(
-        RoadmapFollow.objects.filter(user=request.user).values_list('roadmap_id', flat=True)
-    ) + list(
-        Roadmap.objects.filter(owner=request.user).values_list('id', flat=True)
-    )
+    recommendations = recommend_for_user(request.user)
     
     # Get user's preferred difficulty
     user_difficulty = Roadmap.objects.filter(
@@ -430,22 +369,28 @@ def roadmap_recommendations(request):
     
     preferred_difficulty = user_difficulty['difficulty'] if user_difficulty else 'beginner'
     
-    # Get recommendations
-    recommendations = Roadmap.objects.filter(
-        is_public=True
-    ).exclude(
-        id__in=excluded_ids
-    ).annotate(
-        follower_count=Count('followers')
-    ).order_by('-follower_count')[:8]
-    
-    # Fallback to difficulty-based if not enough
-    if recommendations.count() < 4:
-        additional = Roadmap.objects.filter(
-            is_public=True,
-            difficulty=preferred_difficulty
-        ).exclude(id__in=excluded_ids)[:4]
-        recommendations = list(recommendations) + list(additional)
+    # Cold start: top up with popular roadmaps, then the preferred difficulty
+    if len(recommendations) < 8:
+        excluded_ids = [r.id for r in recommendations] + list(
+            RoadmapFollow.objects.filter(user=request.user).values_list('roadmap_id', flat=True)
+        )
+        popular = Roadmap.objects.filter(
+            is_public=True
+        ).exclude(
+            id__in=excluded_ids
+        ).exclude(
+            owner=request.user
+        ).select_related('owner').order_by('-follower_count')[:8 - len(recommendations)]
+        recommendations += list(popular)
+        
+        if len(recommendations) < 4:
+            additional = Roadmap.objects.filter(
+                is_public=True,
+                difficulty=preferred_difficulty
+            ).exclude(
+                id__in=[r.id for r in recommendations] + excluded_ids
+            ).exclude(owner=request.user).select_related('owner')[:4]
+            recommendations += list(additional)
     
     return render(request, 'roadmaps/recommendations.html', {
         'recommendations': recommendations,
@@ -456,42 +401,14 @@ def roadmap_recommendations(request):
 @login_required
 def roadmap_stats(request):
     """User learning statistics"""
-    created_count = Roadmap.objects.filter(owner=request.user).count()
-    following_count = RoadmapFollow.objects.filter(user=request.user).count()
-    completed_count = RoadmapFollow.objects.filter(user=request.user, completed_at__isnull=False).count()
-    
-    # Calculate total watched time
-    total_watched = VideoProgress.objects.filter(user=request.user).aggregate(
-        total=Sum('current_time')
-    )['total'] or 0
-    total_watched_hours = round(total_watched / 3600, 1)
-    
-    stats = {
-        'created_count': created_count,
-        'following_count': following_count,
-        'completed_count': completed_count,
-        'total_watched_hours': total_watched_hours,
-        'completion_rate': int((completed_count / following_count) * 100) if following_count > 0 else 0,
-    }
+    stats = get_learning_stats(request.user)
     
     return render(request, 'roadmaps/stats.html', {'stats': stats})
 
 
 def roadmap_categories(request):
     """Browse roadmaps by difficulty categories"""
-    categories = {}
-    for difficulty, display_name in Roadmap.DIFFICULTY_CHOICES:
-        categories[difficulty] = {
-            'roadmaps': Roadmap.objects.filter(
-                is_public=True, difficulty=difficulty
-            ).annotate(
-                follower_count=Count('followers')
-            ).order_by('-follower_count')[:6],
-            'display_name': display_name,
-            'icon': {'beginner': '🎯', 'intermediate': '🚀', 'advanced': '🏆'}[difficulty]
-        }
-    
-    return render(request, 'roadmaps/categories.html', {'categories': categories})
+    return render(request, 'roadmaps/categories.html', {'categories': get_categories()})
 
 
 @login_required
@@ -516,11 +433,8 @@ def reset_progress(request, roadmap_id):
 
 # API Views
 def api_roadmap_list(request):
-    """API endpoint for roadmaps"""
-    roadmaps = Roadmap.objects.filter(is_public=True).annotate(
-        follower_count=Count('followers'),
-        channel_count=Count('channels')
-    ).order_by('-created_at')[:20]
+    """Unversioned endpoint kept for old clients; new ones should use api_v1_roadmaps"""
+    roadmaps = Roadmap.objects.filter(is_public=True).select_related('owner').order_by('-created_at')[:20]
     
     data = [{
         'id': r.id,
@@ -534,4 +448,36 @@ def api_roadmap_list(request):
         'created_at': r.created_at.isoformat(),
     } for r in roadmaps]
     
-    return JsonResponse({'roadmaps': data})
\ No newline at end of file
+    return JsonResponse({'roadmaps': data})
+
+
+def api_v1_roadmaps(request):
+    """Public roadmaps, newest first, with cursor pagination and conditional GET.
+
+    Query parameters: ``cursor``, ``limit``, ``fields`` and the list page
+    filters (``search``, ``difficulty``, ``max_hours``).
+    """
+    try:
+        fields = api.parse_fields(request.GET.get('fields'))
+        limit = api.parse_limit(request.GET.get('limit'))
+        cursor = request.GET.get('cursor')
+        if cursor:
+            api.decode_cursor(cursor)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    queryset = filter_roadmaps(Roadmap.objects.filter(is_public=True), request.GET)
+    etag, last_modified = api.validators(queryset, request.GET)
+    last_modified = last_modified and int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        page = api.page_queryset(queryset, fields, cursor)
+        if limit > api.API_STREAM_THRESHOLD:
+            response = StreamingHttpResponse(api.stream_page(page, fields, limit), content_type='application/json')
+        else:
+            response = JsonResponse(api.render_page(page, fields, limit))
+
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
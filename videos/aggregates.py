@@ -0,0 +1,102 @@
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.dispatch import Signal
+
+from channels.models import Channel
+from .models import UserChannelProgress, Video
+
+# Sent with ``channel_ids`` after video_count or total_duration of those channels may have changed
+channel_totals_changed = Signal()
+
+
+def _totals_changed(channel_ids):
+    channel_totals_changed.send(sender=Channel, channel_ids=list(channel_ids))
+
+
+def _channel_videos(field, aggregate):
+    return Subquery(
+        Video.objects.filter(channel_id=OuterRef('pk'))
+        .order_by()
+        .values('channel_id')
+        .annotate(value=aggregate(field))
+        .values('value')[:1]
+    )
+
+
+def _channel_learners():
+    return Coalesce(Subquery(
+        UserChannelProgress.objects.filter(channel_id=OuterRef('pk'))
+        .order_by()
+        .values('channel_id')
+        .annotate(value=Count('id'))
+        .values('value')[:1]
+    ), Value(0))
+
+
+def refresh_channel_aggregates(channel_ids):
+    """Recompute the stored aggregates of the given channels in one UPDATE"""
+    updated = Channel.objects.filter(id__in=channel_ids).update(
+        video_count=Coalesce(_channel_videos('id', Count), Value(0)),
+        total_duration=Coalesce(_channel_videos('duration', Sum), Value(0.0)),
+        max_order=Coalesce(_channel_videos('order', Max), Value(0)),
+        last_uploaded_at=_channel_videos('uploaded_at', Max),
+        learner_count=_channel_learners(),
+    )
+    _totals_changed(channel_ids)
+    return updated
+
+
+def refresh_learner_counts(channel_ids=None):
+    channels = Channel.objects.all() if channel_ids is None else Channel.objects.filter(id__in=channel_ids)
+    return channels.update(learner_count=_channel_learners())
+
+
+def learners_added(counts):
+    """Bump learner_count by ``{channel_id: new_rollups}``"""
+    for channel_id, added in counts.items():
+        Channel.objects.filter(id=channel_id).update(learner_count=F('learner_count') + added)
+
+
+def _refresh_extremes(channel_id):
+    # max_order/last_uploaded_at cannot be decremented, so re-read them
+    Channel.objects.filter(id=channel_id).update(
+        max_order=Coalesce(_channel_videos('order', Max), Value(0)),
+        last_uploaded_at=_channel_videos('uploaded_at', Max),
+    )
+
+
+def video_added(video):
+    Channel.objects.filter(id=video.channel_id).update(
+        video_count=F('video_count') + 1,
+        total_duration=F('total_duration') + (video.duration or 0),
+        max_order=Greatest(F('max_order'), Value(video.order)),
+        last_uploaded_at=Coalesce(Greatest(F('last_uploaded_at'), Value(video.uploaded_at)), Value(video.uploaded_at)),
+    )
+    _totals_changed([video.channel_id])
+
+
+def video_changed(video, old_channel_id, old_order, old_duration):
+    if old_channel_id != video.channel_id:
+        refresh_channel_aggregates([old_channel_id, video.channel_id])
+        return
+
+    updates = {}
+    if (video.duration or 0) != (old_duration or 0):
+        updates['total_duration'] = F('total_duration') + ((video.duration or 0) - (old_duration or 0))
+    if video.order > old_order:
+        updates['max_order'] = Greatest(F('max_order'), Value(video.order))
+    if updates:
+        Channel.objects.filter(id=video.channel_id).update(**updates)
+    if 'total_duration' in updates:
+        _totals_changed([video.channel_id])
+    if video.order < old_order:
+        _refresh_extremes(video.channel_id)
+
+
+def video_removed(video):
+    Channel.objects.filter(id=video.channel_id).update(
+        video_count=Greatest(F('video_count') - 1, Value(0)),
+        total_duration=F('total_duration') - (video.duration or 0),
+    )
+    _refresh_extremes(video.channel_id)
+    _totals_changed([video.channel_id])
@@ -0,0 +1,131 @@
+import hashlib
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Video
+
+GENERATION_KEY = 'autocomplete:generation'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    return ' '.join(_TOKEN_RE.findall(text.lower()))
+
+
+def current_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+
+
+def bump_generation():
+    """Invalidate every worker's index and all cached responses"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
+
+
+def thumbnail_for(thumbnail_url, youtube_id):
+    if thumbnail_url:
+        return thumbnail_url
+    if youtube_id:
+        return f"https://img.youtube.com/vi/{youtube_id}/mqdefault.jpg"
+    return ''
+
+
+class TitleIndex:
+    """Compact in-memory prefix index over video titles.
+
+    Titles are split into tokens; a sorted token list lets a prefix be
+    resolved with one bisect, and each token maps to the ids of the videos
+    containing it.
+    """
+
+    def __init__(self, rows):
+        self.entries = {}
+        postings = {}
+        for video_id, title, thumbnail_url, youtube_id in rows:
+            lowered = title.lower()
+            self.entries[video_id] = (title, lowered, thumbnail_for(thumbnail_url, youtube_id))
+            for token in set(_TOKEN_RE.findall(lowered)):
+                postings.setdefault(token, []).append(video_id)
+        self.tokens = sorted(postings)
+        self.postings = [postings[token] for token in self.tokens]
+
+    def _prefix_matches(self, prefix):
+        matched = set()
+        i = bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            matched.update(self.postings[i])
+            i += 1
+        return matched
+
+    def search(self, query, limit):
+        phrase = normalize(query)
+        terms = phrase.split()
+        if not terms:
+            return []
+
+        # Longest term first: it usually has the smallest posting set
+        terms.sort(key=len, reverse=True)
+        candidates = self._prefix_matches(terms[0])
+        for term in terms[1:]:
+            if not candidates:
+                break
+            candidates &= self._prefix_matches(term)
+
+        def rank(video_id):
+            title, lowered, _ = self.entries[video_id]
+            return (not lowered.startswith(phrase), phrase not in lowered, len(title), video_id)
+
+        return [
+            {'id': video_id, 'title': self.entries[video_id][0], 'thumbnail_url': self.entries[video_id][2]}
+            for video_id in sorted(candidates, key=rank)[:limit]
+        ]
+
+
+class AutocompleteEngine:
+    """Per-worker holder that rebuilds the TitleIndex when the generation changes"""
+
+    def __init__(self):
+        self._index = None
+        self._generation = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        rows = Video.objects.order_by().values_list('id', 'title', 'thumbnail_url', 'youtube_id').iterator(chunk_size=2000)
+        return TitleIndex(rows)
+
+    def index(self, generation=None):
+        generation = generation or current_generation()
+        max_age = getattr(settings, 'AUTOCOMPLETE_INDEX_MAX_AGE', 300)
+        if self._index is None or self._generation != generation or time.monotonic() - self._built_at > max_age:
+            with self._lock:
+                if self._index is None or self._generation != generation or time.monotonic() - self._built_at > max_age:
+                    self._index = self._load()
+                    self._generation = generation
+                    self._built_at = time.monotonic()
+        return self._index
+
+    def search(self, query, limit=5):
+        """Top ``limit`` titles matching every term of ``query`` as a prefix, cached briefly"""
+        normalized = normalize(query)[:100]
+        if not normalized:
+            return []
+
+        generation = current_generation()
+        digest = hashlib.md5(normalized.encode()).hexdigest()
+        cache_key = f'autocomplete:{generation}:{limit}:{digest}'
+        results = cache.get(cache_key)
+        if results is None:
+            results = self.index(generation).search(normalized, limit)
+            cache.set(cache_key, results, getattr(settings, 'AUTOCOMPLETE_CACHE_TTL', 60))
+        return results
+
+
+engine = AutocompleteEngine()
@@ -0,0 +1,137 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils.timezone import now
+
+from .progress import COMPLETION_THRESHOLD, apply_progress_entries
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """Write-behind buffer that coalesces progress heartbeats per (user, video).
+
+    Heartbeats are merged in memory keeping the max current_time and
+    watched_percentage, then written as one batch of upserts when the flush
+    interval elapses, the buffer fills up, or a video crosses the completion
+    threshold. A failed write puts the entries back for the next flush. The
+    buffer is shared by all threads of a worker process.
+    """
+
+    def __init__(self, flush_interval=None, max_size=None):
+        self.flush_interval = flush_interval or getattr(settings, 'PROGRESS_FLUSH_INTERVAL', 10)
+        self.max_size = max_size or getattr(settings, 'PROGRESS_BUFFER_SIZE', 200)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self.stats = {
+            'batches': 0,
+            'rows_flushed': 0,
+            'last_batch_rows': 0,
+            'max_batch_rows': 0,
+            'heartbeats': 0,
+        }
+
+    def add(self, user_id, video_id, current_time, watched_percentage, watched_at=None):
+        """Merge a heartbeat into the buffer and return the merged (time, percentage)."""
+        key = (user_id, video_id)
+        with self._lock:
+            previous = self._entries.get(key)
+            merged_time, merged_percentage, _ = self._merge(key, (current_time, watched_percentage, watched_at or now()))
+            self.stats['heartbeats'] += 1
+
+            crossed = (
+                merged_percentage >= COMPLETION_THRESHOLD
+                and (previous is None or previous[1] < COMPLETION_THRESHOLD)
+            )
+            due = (
+                crossed
+                or len(self._entries) >= self.max_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if not due:
+                self._schedule()
+
+        if due:
+            self._flush_logged()
+        return merged_time, merged_percentage
+
+    def _merge(self, key, entry):
+        # Caller holds self._lock; keeps the max of each field
+        previous = self._entries.get(key)
+        if previous:
+            entry = tuple(max(old, new) for old, new in zip(previous, entry))
+        self._entries[key] = entry
+        return entry
+
+    def _flush_logged(self):
+        # A failed write is requeued by flush(); don't fail the caller over it
+        try:
+            return self.flush()
+        except DatabaseError:
+            logger.exception('Progress buffer flush failed; %d entries kept for retry', len(self._entries))
+            return 0
+
+    def _schedule(self):
+        # Caller holds self._lock
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        try:
+            self._flush_logged()
+        finally:
+            connections.close_all()
+
+    def flush(self):
+        """Write all buffered entries in a single batch. Returns rows written.
+
+        If the write raises, the entries are merged back into the buffer
+        before the error propagates.
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, {}
+                self._last_flush = time.monotonic()
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            if not entries:
+                return 0
+
+            try:
+                rows = apply_progress_entries(entries)
+            except Exception:
+                with self._lock:
+                    for key, entry in entries.items():
+                        self._merge(key, entry)
+                    self._schedule()
+                raise
+            with self._lock:
+                self.stats['batches'] += 1
+                self.stats['rows_flushed'] += rows
+                self.stats['last_batch_rows'] = rows
+                self.stats['max_batch_rows'] = max(self.stats['max_batch_rows'], rows)
+            return rows
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['buffered'] = len(self._entries)
+        stats['avg_batch_rows'] = round(stats['rows_flushed'] / stats['batches'], 1) if stats['batches'] else 0
+        stats['flush_interval'] = self.flush_interval
+        stats['max_size'] = self.max_size
+        return stats
+
+
+progress_buffer = ProgressBuffer()
+atexit.register(progress_buffer._flush_logged)
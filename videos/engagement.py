@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils.timezone import now
+
+from .models import ChannelEngagement, ChannelEngagementRun, VideoProgress
+from .progress import COMPLETION_THRESHOLD
+
+WINDOWS = (timedelta(days=7), timedelta(days=30))
+
+# Channels per grouped aggregate; keeps the IN list under SQLite's variable limit
+ENGAGEMENT_CHUNK_SIZE = 500
+
+# How far before the previous run incremental runs look for writes again, so
+# a write stamped before that run but committed after it is not missed
+SYNC_OVERLAP = timedelta(minutes=1)
+
+METRIC_FIELDS = [
+    'watch_seconds_7d', 'watch_seconds_30d',
+    'active_learners_7d', 'active_learners_30d',
+    'completions_7d', 'completions_30d',
+]
+
+# Ordering for "trending" lists of Channel rows
+TRENDING_ORDER = (
+    F('engagement__watch_seconds_7d').desc(nulls_last=True),
+    F('engagement__watch_seconds_30d').desc(nulls_last=True),
+    '-id',
+)
+
+
+def touched_channels(since, until):
+    """Channels whose windowed metrics may have changed between two runs.
+
+    That is every channel with a progress row written in (since, until], plus
+    those with rows that slid out of a window over the same interval. Writes
+    are found by the server-side synced_at: replayed offline entries and
+    write-behind flushes can carry a last_watched older than ``since``. The
+    synced_at range starts SYNC_OVERLAP early to catch late commits.
+    """
+    interval = Q(synced_at__gt=since - SYNC_OVERLAP, synced_at__lte=until)
+    for window in WINDOWS:
+        interval |= Q(last_watched__gt=since - window, last_watched__lte=until - window)
+    return set(
+        VideoProgress.objects.filter(interval)
+        .order_by()
+        .values_list('video__channel_id', flat=True)
+        .distinct()
+    )
+
+
+def compute_engagement(channel_ids, at):
+    """Recompute and store ChannelEngagement for ``channel_ids`` as of ``at``"""
+    week = Q(last_watched__gt=at - timedelta(days=7))
+    completed = Q(watched_percentage__gte=COMPLETION_THRESHOLD)
+    channel_ids = sorted(channel_ids)
+
+    written = 0
+    for start in range(0, len(channel_ids), ENGAGEMENT_CHUNK_SIZE):
+        chunk = channel_ids[start:start + ENGAGEMENT_CHUNK_SIZE]
+        rows = {
+            row.pop('video__channel_id'): row
+            for row in VideoProgress.objects.filter(
+                video__channel_id__in=chunk,
+                last_watched__gt=at - timedelta(days=30),
+                last_watched__lte=at,
+            ).order_by().values('video__channel_id').annotate(
+                watch_seconds_7d=Sum('current_time', filter=week, default=0),
+                watch_seconds_30d=Sum('current_time', default=0),
+                active_learners_7d=Count('user_id', filter=week, distinct=True),
+                active_learners_30d=Count('user_id', distinct=True),
+                completions_7d=Count('id', filter=week & completed),
+                completions_30d=Count('id', filter=completed),
+            )
+        }
+        # Channels with no activity left in either window are written as zeros
+        ChannelEngagement.objects.bulk_create(
+            [ChannelEngagement(channel_id=channel_id, computed_at=at, **rows.get(channel_id, {})) for channel_id in chunk],
+            update_conflicts=True,
+            unique_fields=['channel'],
+            update_fields=METRIC_FIELDS + ['computed_at'],
+        )
+        written += len(chunk)
+    return written
+
+
+def refresh_engagement(full=False):
+    """Bring ChannelEngagement up to date and record the run.
+
+    Only channels touched since the previous run are recomputed, unless there
+    is no previous run or ``full`` is set. Returns the ChannelEngagementRun.
+    """
+    started_at = now()
+    previous = ChannelEngagementRun.objects.order_by('-started_at').first()
+
+    if full or previous is None:
+        channel_ids = set(
+            VideoProgress.objects.filter(last_watched__gt=started_at - max(WINDOWS))
+            .order_by().values_list('video__channel_id', flat=True).distinct()
+        )
+        channel_ids.update(ChannelEngagement.objects.values_list('channel_id', flat=True))
+        full = True
+    else:
+        channel_ids = touched_channels(previous.started_at, started_at)
+
+    with transaction.atomic():
+        updated = compute_engagement(channel_ids, started_at)
+        return ChannelEngagementRun.objects.create(
+            started_at=started_at, finished_at=now(), channels_updated=updated, full=full,
+        )
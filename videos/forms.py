@@ -15,3 +15,19 @@ class VideoForm(forms.ModelForm):
         }
 
 
+
+
+class VideoImportForm(VideoForm):
+    """Validates one row of a bulk import; order is assigned when missing"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['order'].required = False
+        self.fields['duration'].required = False
+
+
+class VideoUploadForm(forms.Form):
+    FORMAT_CHOICES = [('', 'Detect from file name'), ('csv', 'CSV'), ('json', 'JSON')]
+
+    file = forms.FileField(help_text='CSV with a header row, or a JSON array / JSON lines of objects')
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
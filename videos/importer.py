@@ -0,0 +1,161 @@
+import csv
+import json
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from channels.models import Channel
+from .aggregates import refresh_channel_aggregates
+from .forms import VideoImportForm
+from .models import Video, extract_youtube_id
+
+IMPORT_CHUNK_SIZE = 500
+# Largest single JSON object accepted before the stream is declared invalid
+MAX_JSON_ROW_SIZE = 1024 * 1024
+IMPORT_FIELDS = ('title', 'youtube_url', 'order', 'description', 'duration', 'thumbnail_url')
+
+# Sent once per inserted chunk, since bulk_create bypasses post_save
+videos_imported = Signal()
+
+
+def detect_format(name):
+    return 'json' if name.lower().endswith(('.json', '.jsonl', '.ndjson')) else 'csv'
+
+
+def iter_csv_rows(stream):
+    """Yield ``(line_number, row_dict)`` from a CSV text stream with a header row.
+
+    Malformed CSV (e.g. a NUL byte or a broken quoted field) raises ValueError.
+    """
+    reader = csv.DictReader(stream)
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as exc:
+        raise ValueError(f'Invalid CSV at line {reader.line_num}: {exc}')
+
+
+def iter_json_rows(stream, read_size=64 * 1024):
+    """Yield ``(item_number, object)`` from a JSON array or JSON lines text stream.
+
+    Objects are decoded one at a time from a rolling buffer, so the whole
+    document is never held in memory. Invalid JSON raises ValueError.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    number = 0
+    started = eof = False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,' if started else ' \t\r\n')
+        if buffer and not started:
+            # A top-level array is unwrapped; JSON lines start straight at an object
+            started = True
+            if buffer[0] == '[':
+                buffer = buffer[1:]
+            continue
+        if buffer.startswith(']'):
+            buffer = buffer[1:]
+            continue
+        if not buffer:
+            if eof:
+                return
+            chunk = stream.read(read_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof or len(buffer) > MAX_JSON_ROW_SIZE:
+                raise ValueError(f'Invalid JSON after item {number}')
+            chunk = stream.read(read_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        number += 1
+        buffer = buffer[end:]
+        yield number, obj
+
+
+def iter_rows(stream, fmt):
+    return iter_json_rows(stream) if fmt == 'json' else iter_csv_rows(stream)
+
+
+def import_videos(channel, rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate, de-duplicate and bulk insert ``rows`` into ``channel``.
+
+    ``rows`` yields ``(line_number, mapping)`` pairs, e.g. from iter_rows().
+    Invalid rows and YouTube ids already in the channel (or earlier in the
+    file) are reported and skipped without aborting the rest. Rows without an
+    order are appended after the channel's current last video.
+
+    Returns a dict with ``created``, ``skipped`` and ``errors``, a list of
+    ``(line_number, message)`` where line_number is None if the input itself
+    stopped being parseable.
+    """
+    report = {'created': 0, 'skipped': 0, 'errors': []}
+    seen = set(
+        Video.objects.filter(channel=channel, youtube_id__isnull=False)
+        .values_list('youtube_id', flat=True)
+    )
+    next_order = Channel.objects.filter(pk=channel.pk).values_list('max_order', flat=True).get() + 1
+
+    def reject(line, message):
+        report['skipped'] += 1
+        report['errors'].append((line, message))
+
+    pending = []
+    try:
+        for line, row in rows:
+            if not isinstance(row, dict):
+                reject(line, 'Expected an object with video fields')
+                continue
+
+            form = VideoImportForm({
+                field: row.get(field) for field in IMPORT_FIELDS if row.get(field) not in (None, '')
+            })
+            if not form.is_valid():
+                message = '; '.join(
+                    f"{field}: {' '.join(errors)}" for field, errors in form.errors.items()
+                )
+                reject(line, message)
+                continue
+
+            video = form.save(commit=False)
+            youtube_id = extract_youtube_id(video.youtube_url)
+            if youtube_id is None:
+                reject(line, 'youtube_url: Not a recognised YouTube URL')
+                continue
+            if youtube_id in seen:
+                reject(line, f'Duplicate video {youtube_id}')
+                continue
+            seen.add(youtube_id)
+
+            video.channel = channel
+            video.youtube_id = youtube_id
+            video.youtube_url = f"https://www.youtube.com/embed/{youtube_id}"
+            if video.order is None:
+                video.order = next_order
+            next_order = max(next_order, video.order + 1)
+
+            pending.append(video)
+            if len(pending) >= chunk_size:
+                report['created'] += _insert_chunk(channel, pending)
+                pending = []
+    except UnicodeDecodeError:
+        report['errors'].append((None, 'The file is not valid UTF-8 text'))
+    except ValueError as exc:
+        # The source itself is unreadable past this point; keep what was parsed
+        report['errors'].append((None, str(exc)))
+
+    if pending:
+        report['created'] += _insert_chunk(channel, pending)
+    return report
+
+
+def _insert_chunk(channel, videos):
+    with transaction.atomic():
+        created = Video.objects.bulk_create(videos)
+        refresh_channel_aggregates([channel.id])
+        videos_imported.send(sender=Video, channel=channel, videos=created)
+    return len(created)
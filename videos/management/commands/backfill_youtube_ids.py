@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from videos.models import Video, extract_youtube_id
+
+
+class Command(BaseCommand):
+    help = 'Populate Video.youtube_id from youtube_url in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', help='Recompute ids that are already set')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        queryset = Video.objects.order_by('pk').only('id', 'channel_id', 'youtube_url', 'youtube_id')
+        if not options['all']:
+            queryset = queryset.filter(youtube_id__isnull=True)
+
+        last_pk = 0
+        updated = skipped = duplicates = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+
+            parsed = {video.pk: extract_youtube_id(video.youtube_url) for video in chunk}
+            taken = {
+                (channel_id, youtube_id): pk
+                for pk, channel_id, youtube_id in Video.objects.filter(
+                    youtube_id__in={yid for yid in parsed.values() if yid}
+                ).values_list('pk', 'channel_id', 'youtube_id')
+            }
+
+            changed = []
+            for video in chunk:
+                youtube_id = parsed[video.pk]
+                if youtube_id is None:
+                    skipped += 1
+                    continue
+                owner = taken.get((video.channel_id, youtube_id))
+                if owner is not None and owner != video.pk:
+                    duplicates += 1
+                    self.stderr.write(f'Video {video.pk}: duplicate of video {owner} in channel {video.channel_id}')
+                    continue
+                taken[(video.channel_id, youtube_id)] = video.pk
+                if video.youtube_id != youtube_id:
+                    video.youtube_id = youtube_id
+                    changed.append(video)
+
+            with transaction.atomic():
+                Video.objects.bulk_update(changed, ['youtube_id'])
+            updated += len(changed)
+            self.stdout.write(f'Processed up to video {last_pk} ({updated} updated)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled {updated} videos; {skipped} without a YouTube id, {duplicates} duplicates skipped'
+        ))
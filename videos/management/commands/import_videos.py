@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from channels.models import Channel
+from videos.importer import IMPORT_CHUNK_SIZE, detect_format, import_videos, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import videos into a channel from a CSV or JSON playlist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('channel_id', type=int)
+        parser.add_argument('path', help='CSV with a header row, JSON array or JSON lines file')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            channel = Channel.objects.get(pk=options['channel_id'])
+        except Channel.DoesNotExist:
+            raise CommandError(f"Channel {options['channel_id']} does not exist")
+
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                report = import_videos(channel, iter_rows(stream, fmt), options['chunk_size'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for line, message in report['errors']:
+            self.stderr.write(f'Row {line}: {message}' if line else message)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} videos into {channel.name}; {report['skipped']} rows skipped"
+        ))
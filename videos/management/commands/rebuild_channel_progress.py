@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from videos.models import UserChannelProgress, VideoProgress
+from videos.aggregates import refresh_learner_counts
+from videos.progress import refresh_channel_progress
+
+
+def _rebuild_chunk(user_ids):
+    try:
+        with transaction.atomic():
+            # Drop rollups whose progress rows are gone, then recompute the rest
+            UserChannelProgress.objects.filter(user_id__in=user_ids).exclude(
+                channel_id__in=VideoProgress.objects.filter(user_id__in=user_ids).values('video__channel_id')
+            ).delete()
+            return refresh_channel_progress(user_ids, credit_watch_time=False)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Recompute UserChannelProgress rollups from VideoProgress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200, help='Users per chunk')
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            written = sum(executor.map(_rebuild_chunk, chunks))
+        # Stale rollups were dropped above, so recount learners from scratch
+        refresh_learner_counts()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} channel rollups for {len(user_ids)} users in {len(chunks)} chunks'
+        ))
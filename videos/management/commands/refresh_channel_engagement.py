@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from videos.engagement import refresh_engagement
+
+
+class Command(BaseCommand):
+    help = 'Update ChannelEngagement from progress watched since the previous run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every channel with recent activity')
+
+    def handle(self, *args, **options):
+        run = refresh_engagement(full=options['full'])
+        kind = 'Full' if run.full else 'Incremental'
+        self.stdout.write(self.style.SUCCESS(
+            f'{kind} refresh updated {run.channels_updated} channels in '
+            f'{(run.finished_at - run.started_at).total_seconds():.2f}s'
+        ))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:48
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of videos.models.YOUTUBE_ID_PATTERNS
+YOUTUBE_ID_PATTERNS = [
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([\w-]{11})'),
+    re.compile(r'youtube\.com\/watch\?.*v=([\w-]{11})'),
+]
+
+
+def extract_youtube_id(url):
+    for pattern in YOUTUBE_ID_PATTERNS:
+        match = pattern.search(url or '')
+        if match:
+            return match.group(1)
+    return None
+
+
+def populate_youtube_ids(apps, schema_editor):
+    """Fill youtube_id before the unique constraint exists.
+
+    When a channel holds the same YouTube video twice, the oldest row (lowest
+    pk) keeps the id and later copies stay NULL; their pages fall back to
+    parsing youtube_url (Video.player_youtube_id).
+    """
+    Video = apps.get_model('videos', 'Video')
+    taken = set()
+    changed = []
+    for video in Video.objects.order_by('pk').only('id', 'channel_id', 'youtube_url').iterator(chunk_size=1000):
+        youtube_id = extract_youtube_id(video.youtube_url)
+        if youtube_id is None or (video.channel_id, youtube_id) in taken:
+            continue
+        taken.add((video.channel_id, youtube_id))
+        video.youtube_id = youtube_id
+        changed.append(video)
+    Video.objects.bulk_update(changed, ['youtube_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0003_channel_ch_logo'),
+        ('videos', '0002_video_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='youtube_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=11, null=True),
+        ),
+        migrations.RunPython(populate_youtube_ids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='video',
+            constraint=models.UniqueConstraint(fields=('channel', 'youtube_id'), name='unique_channel_youtube_id'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def populate_rollups(apps, schema_editor):
+    VideoProgress = apps.get_model('videos', 'VideoProgress')
+    UserChannelProgress = apps.get_model('videos', 'UserChannelProgress')
+    rows = VideoProgress.objects.order_by().values(
+        'user_id', 'video__channel_id', 'video__channel__video_count'
+    ).annotate(
+        completed=Count('id', filter=Q(watched_percentage__gte=95)),
+        watched=Sum('current_time'),
+    )
+    now = timezone.now()
+    UserChannelProgress.objects.bulk_create([
+        UserChannelProgress(
+            user_id=row['user_id'],
+            channel_id=row['video__channel_id'],
+            completed_videos=row['completed'],
+            watched_seconds=row['watched'] or 0,
+            last_video_id=VideoProgress.objects.filter(
+                user_id=row['user_id'], video__channel_id=row['video__channel_id']
+            ).order_by('-last_watched').values_list('video_id', flat=True).first(),
+            completed_at=now if 0 < row['video__channel__video_count'] <= row['completed'] else None,
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0004_channel_aggregates'),
+        ('videos', '0003_video_youtube_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserChannelProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_videos', models.PositiveIntegerField(default=0)),
+                ('watched_seconds', models.FloatField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('channel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_progress', to='channels.channel')),
+                ('last_video', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='videos.video')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='channel_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'channel')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
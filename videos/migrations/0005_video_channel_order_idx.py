@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0004_channel_aggregates'),
+        ('videos', '0004_user_channel_progress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['channel', 'order', 'id'], name='video_channel_order_idx'),
+        ),
+    ]
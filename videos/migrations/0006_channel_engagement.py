@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0006_channel_learner_count'),
+        ('videos', '0005_video_channel_order_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelEngagement',
+            fields=[
+                ('channel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='engagement', serialize=False, to='channels.channel')),
+                ('watch_seconds_7d', models.FloatField(default=0)),
+                ('watch_seconds_30d', models.FloatField(default=0)),
+                ('active_learners_7d', models.PositiveIntegerField(default=0)),
+                ('active_learners_30d', models.PositiveIntegerField(default=0)),
+                ('completions_7d', models.PositiveIntegerField(default=0)),
+                ('completions_30d', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChannelEngagementRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('channels_updated', models.PositiveIntegerField(default=0)),
+                ('full', models.BooleanField(default=False)),
+            ],
+            options={
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(fields=['last_watched'], name='progress_last_watched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='channelengagement',
+            index=models.Index(fields=['-watch_seconds_7d', '-watch_seconds_30d'], name='engagement_trending_idx'),
+        ),
+    ]
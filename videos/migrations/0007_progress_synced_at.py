@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:24
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_synced_at(apps, schema_editor):
+    VideoProgress = apps.get_model('videos', 'VideoProgress')
+    VideoProgress.objects.update(synced_at=F('last_watched'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0006_channel_engagement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprogress',
+            name='synced_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(populate_synced_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(fields=['synced_at'], name='progress_synced_at_idx'),
+        ),
+    ]
@@ -1,6 +1,61 @@
-from django.db import models
+from django.db import connections, models
 from channels.models import Channel
 from django.contrib.auth.models import User
+from django.db.models import Count, F, Window
+from django.db.models.functions import Lag, Lead, RowNumber
+import re
+
+# Compiled once at import; YouTube video ids are 11 characters of [A-Za-z0-9_-]
+YOUTUBE_ID_PATTERNS = [
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([\w-]{11})'),
+    re.compile(r'youtube\.com\/watch\?.*v=([\w-]{11})'),
+]
+
+
+def extract_youtube_id(url):
+    """Extract YouTube video ID from various URL formats"""
+    for pattern in YOUTUBE_ID_PATTERNS:
+        match = pattern.search(url or '')
+        if match:
+            return match.group(1)
+    return None
+
+
+# Columns needed to render a playlist row; leaves out description text
+PLAYLIST_FIELDS = ('id', 'title', 'order', 'channel_id', 'thumbnail_url', 'duration', 'youtube_id')
+
+
+class VideoQuerySet(models.QuerySet):
+    def playlist(self, channel_id):
+        """A channel's videos in play order, without the description column"""
+        return self.filter(channel_id=channel_id).only(*PLAYLIST_FIELDS).order_by('order', 'id')
+
+    def neighbourhood(self, video):
+        """Return prev/next ids, 1-based position and total for a video in one query"""
+        play_order = {'partition_by': [F('channel_id')], 'order_by': [F('order').asc(), F('id').asc()]}
+        ranked = (
+            self.filter(channel_id=video.channel_id)
+            .order_by()
+            .annotate(
+                prev_id=Window(Lag('id'), **play_order),
+                next_id=Window(Lead('id'), **play_order),
+                position=Window(RowNumber(), **play_order),
+                total=Window(Count('id'), partition_by=[F('channel_id')]),
+            )
+            .values('id', 'prev_id', 'next_id', 'position', 'total')
+        )
+        # Window functions must see the whole channel, so pick the row outside them
+        sql, params = ranked.query.sql_with_params()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT prev_id, next_id, position, total FROM ({sql}) ranked WHERE ranked.id = %s',
+                (*params, video.pk),
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return {'prev_id': None, 'next_id': None, 'position': 1, 'total': 1}
+        return dict(zip(('prev_id', 'next_id', 'position', 'total'), row))
+
 
 class Video(models.Model):
     title = models.CharField(max_length=150)
@@ -11,13 +66,42 @@ class Video(models.Model):
     thumbnail_url = models.URLField(blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     duration=models.FloatField(default=0.0, help_text="Video duration in seconds")
+    youtube_id = models.CharField(max_length=11, null=True, blank=True, editable=False, db_index=True)
+
+    objects = VideoQuerySet.as_manager()
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['channel', 'order', 'id'], name='video_channel_order_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['channel', 'youtube_id'], name='unique_channel_youtube_id'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.channel.name})"
 
+    @property
+    def player_youtube_id(self):
+        # youtube_id stays NULL for rows that predate it as duplicates in their channel
+        return self.youtube_id or extract_youtube_id(self.youtube_url)
+
+    @property
+    def embed_url(self):
+        youtube_id = self.player_youtube_id
+        if youtube_id:
+            return f"https://www.youtube.com/embed/{youtube_id}"
+        return self.youtube_url
+
+    def save(self, *args, **kwargs):
+        # Parse the URL once on write so reads never have to
+        self.youtube_id = extract_youtube_id(self.youtube_url)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'youtube_url' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'youtube_id'}
+        super().save(*args, **kwargs)
+
 
 class VideoProgress(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -25,9 +109,72 @@ class VideoProgress(models.Model):
     current_time = models.FloatField(default=0)
     watched_percentage = models.FloatField(default=0)
     last_watched = models.DateTimeField(auto_now=True)
+    # Server time of the last write; last_watched may carry an older client
+    # timestamp, so incremental jobs use this as their watermark
+    synced_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'video')
+        indexes = [
+            models.Index(fields=['last_watched'], name='progress_last_watched_idx'),
+            models.Index(fields=['synced_at'], name='progress_synced_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.video.title} ({self.watched_percentage:.1f}%)"
+
+
+class UserChannelProgress(models.Model):
+    """Per-user rollup of VideoProgress for one channel, kept current by the progress write path"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='channel_progress')
+    channel = models.ForeignKey(Channel, on_delete=models.CASCADE, related_name='user_progress')
+    completed_videos = models.PositiveIntegerField(default=0)
+    watched_seconds = models.FloatField(default=0)
+    last_video = models.ForeignKey(Video, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'channel')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.channel.name} ({self.completed_videos} completed)"
+
+    @property
+    def progress_percent(self):
+        total_videos = self.channel.video_count
+        return min(int((self.completed_videos / total_videos) * 100), 100) if total_videos else 0
+
+
+class ChannelEngagement(models.Model):
+    """Recent watch activity per channel, materialized by ``manage.py refresh_channel_engagement``"""
+    channel = models.OneToOneField(Channel, on_delete=models.CASCADE, primary_key=True, related_name='engagement')
+    watch_seconds_7d = models.FloatField(default=0)
+    watch_seconds_30d = models.FloatField(default=0)
+    active_learners_7d = models.PositiveIntegerField(default=0)
+    active_learners_30d = models.PositiveIntegerField(default=0)
+    completions_7d = models.PositiveIntegerField(default=0)
+    completions_30d = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-watch_seconds_7d', '-watch_seconds_30d'], name='engagement_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel.name} ({self.active_learners_7d} learners this week)"
+
+
+class ChannelEngagementRun(models.Model):
+    """One refresh of ChannelEngagement; the latest started_at is the next run's watermark"""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    channels_updated = models.PositiveIntegerField(default=0)
+    full = models.BooleanField(default=False)
+
+    class Meta:
+        get_latest_by = 'started_at'
 
     def __str__(self):
-        return f"{self.user.username} - {self.video.title} ({self.watched_percentage:.1f}%)"
\ No newline at end of file
+        return f"Engagement run at {self.started_at:%Y-%m-%d %H:%M} ({self.channels_updated} channels)"
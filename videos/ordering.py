@@ -0,0 +1,82 @@
+import json
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+
+class ReorderError(ValueError):
+    """The reorder payload is malformed or does not match the current items"""
+
+
+class VersionConflict(Exception):
+    """Someone else reordered the items since the client loaded them"""
+
+
+def parse_reorder_payload(body):
+    """Validate a reorder request body.
+
+    Accepts either the full new ordering::
+
+        {"version": 3, "order": [12, 7, 9]}
+
+    or a single move to a 1-based position::
+
+        {"version": 3, "move": {"id": 9, "position": 1}}
+    """
+    try:
+        data = json.loads(body)
+        version = int(data['version'])
+        if 'order' in data:
+            order = [int(key) for key in data['order']]
+            return {'version': version, 'order': order}
+        move = data['move']
+        return {'version': version, 'move': (int(move['id']), int(move['position']))}
+    except (ValueError, TypeError, KeyError):
+        raise ReorderError('Expected {"version": n, "order": [...]} or {"version": n, "move": {"id": x, "position": p}}')
+
+
+def resolve_ordering(current, payload):
+    """Apply ``payload`` to the ``current`` list of keys and return the new list"""
+    if 'order' in payload:
+        order = payload['order']
+        if len(order) != len(current) or set(order) != set(current):
+            raise ReorderError('The ordering must list every item exactly once')
+        return order
+
+    key, position = payload['move']
+    if key not in current:
+        raise ReorderError(f'Unknown item {key}')
+    order = [k for k in current if k != key]
+    order.insert(min(max(position, 1), len(current)) - 1, key)
+    return order
+
+
+def apply_reorder(parent, items, key, payload, max_order_field=None):
+    """Renumber ``items`` 1..n per ``payload`` guarded by ``parent.order_version``.
+
+    ``parent`` is a queryset matching the owning row (channel or roadmap),
+    ``items`` the queryset of its ordered children and ``key`` the field the
+    client identifies them by. The version is compared-and-bumped in the same
+    transaction as a single CASE UPDATE of the rows whose order changed, so a
+    concurrent editor's stale request raises VersionConflict. When the parent
+    caches its highest order in ``max_order_field`` it is rewritten with the
+    version bump. Returns ``(ordering, new_version)``.
+    """
+    with transaction.atomic():
+        current = dict(items.order_by('order', 'pk').values_list(key, 'order'))
+        ordering = resolve_ordering(list(current), payload)
+
+        parent_updates = {max_order_field: len(ordering)} if max_order_field else {}
+        bumped = parent.filter(order_version=payload['version']).update(
+            order_version=F('order_version') + 1, **parent_updates
+        )
+        if not bumped:
+            raise VersionConflict()
+
+        changed = {k: position for position, k in enumerate(ordering, 1) if current[k] != position}
+        if changed:
+            items.filter(**{f'{key}__in': list(changed)}).update(order=Case(
+                *[When(**{key: k}, then=Value(position)) for k, position in changed.items()],
+                output_field=PositiveIntegerField(),
+            ))
+    return ordering, payload['version'] + 1
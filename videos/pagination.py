@@ -0,0 +1,29 @@
+from django.db.models import Q
+
+# Videos rendered per playlist page (inline first page and each fragment)
+PLAYLIST_PAGE_SIZE = 50
+
+
+def encode_cursor(video):
+    return f"{video.order}.{video.id}"
+
+
+def decode_cursor(cursor):
+    """Parse an ``order.id`` cursor; raises ValueError on malformed input"""
+    order, video_id = cursor.split('.')
+    return int(order), int(video_id)
+
+
+def keyset_page(queryset, cursor=None, size=PLAYLIST_PAGE_SIZE):
+    """Return ``(videos, next_cursor)`` for the page after ``cursor`` in (order, id) order.
+
+    Seeks with a WHERE on the composite (channel, order, id) index instead of
+    OFFSET, so every page costs the same however deep it is.
+    """
+    if cursor:
+        order, video_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(order__gt=order) | Q(order=order, id__gt=video_id))
+
+    videos = list(queryset.order_by('order', 'id')[:size + 1])
+    next_cursor = encode_cursor(videos[size - 1]) if len(videos) > size else None
+    return videos[:size], next_cursor
@@ -0,0 +1,391 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.dispatch import Signal
+from django.utils.timezone import now
+
+from .models import UserChannelProgress, Video, VideoProgress
+from . import aggregates
+
+# Watched percentage at which a video counts as completed
+COMPLETION_THRESHOLD = 95
+
+# A heartbeat is only written when it moves progress forward by this much
+SIGNIFICANT_SECONDS = 10
+SIGNIFICANT_PERCENT = 10
+
+# Rows per multi-row upsert statement in apply_progress_entries
+UPSERT_CHUNK_SIZE = 100
+
+# Sent with ``pairs`` (a list of (user_id, channel_id)) when channel rollups
+# become complete, inside the transaction that completed them
+channels_completed = Signal()
+
+# Sent with ``seconds`` ({user_id: delta}) when rollup watch time changes,
+# inside the transaction that changed it. ``credit`` is False for repairs
+# (drift corrections, removed videos) that are not new viewing.
+watch_time_added = Signal()
+
+
+def get_progress_index(user, videos):
+    """Load a user's progress for a set of videos in a single query.
+
+    ``videos`` is any iterable of Video objects (typically a channel's ordered
+    queryset). Returns the per-video progress map plus channel-level aggregates
+    so views never have to query VideoProgress row by row.
+    """
+    videos = list(videos)
+
+    progress_map = {}
+    if user.is_authenticated and videos:
+        progress_map = {
+            prog.video_id: prog
+            for prog in VideoProgress.objects.filter(user=user, video__in=videos)
+        }
+
+    progress_dict = {}
+    watched_seconds = 0
+    completed_count = 0
+    total_duration = 0
+    first_incomplete = None
+
+    for video in videos:
+        prog = progress_map.get(video.id)
+        progress_dict[video.id] = prog
+        total_duration += video.duration or 0
+        if prog:
+            watched_seconds += prog.current_time
+        if prog and prog.watched_percentage >= COMPLETION_THRESHOLD:
+            completed_count += 1
+        elif first_incomplete is None and user.is_authenticated:
+            first_incomplete = video
+
+    total_videos = len(videos)
+
+    return {
+        'videos': videos,
+        'progress_dict': progress_dict,
+        'watched_seconds': watched_seconds,
+        'completed_count': completed_count,
+        'first_incomplete': first_incomplete,
+        'all_completed': total_videos > 0 and completed_count == total_videos,
+        'total_duration': total_duration,
+        'total_videos': total_videos,
+        'progress_percent': int((completed_count / total_videos) * 100) if total_videos else 0,
+    }
+
+
+def first_incomplete_video(user, channel_id):
+    """First video of the channel, in playlist order, the user has not completed"""
+    if not user.is_authenticated:
+        return None
+    completed = VideoProgress.objects.filter(
+        user=user, video__channel_id=channel_id, watched_percentage__gte=COMPLETION_THRESHOLD,
+    ).values('video_id')
+    return (
+        Video.objects.filter(channel_id=channel_id)
+        .exclude(id__in=completed)
+        .only('id', 'order')
+        .order_by('order', 'id')
+        .first()
+    )
+
+
+def apply_progress_entries(entries, significant_only=False):
+    """Max-merge progress entries into VideoProgress in one transaction.
+
+    ``entries`` maps ``(user_id, video_id)`` to ``(current_time,
+    watched_percentage, watched_at)``. Each chunk is one INSERT ... ON
+    CONFLICT statement that keeps the max of the stored and incoming values,
+    so concurrent syncs never read-then-write. With ``significant_only``
+    existing rows only move on heartbeats that clear the same thresholds as
+    upsert_progress. Entries for videos that no longer exist are dropped.
+    Returns the number of rows actually changed.
+    """
+    if not entries:
+        return 0
+
+    video_channels = dict(
+        Video.objects.filter(id__in={video_id for _, video_id in entries})
+        .values_list('id', 'channel_id')
+    )
+    synced_at = now()
+    rows = [
+        (user_id, video_id, current_time, percentage, watched_at, synced_at)
+        for (user_id, video_id), (current_time, percentage, watched_at) in entries.items()
+        if video_id in video_channels
+    ]
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        if connection.vendor in ('sqlite', 'postgresql'):
+            written = []
+            with connection.cursor() as cursor:
+                for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                    chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+                    params = [value for row in chunk for value in row]
+                    if significant_only:
+                        params += [SIGNIFICANT_SECONDS, SIGNIFICANT_PERCENT, COMPLETION_THRESHOLD]
+                    cursor.execute(_upsert_sql(len(chunk), significant_only), params)
+                    written.extend(cursor.fetchall())
+        else:
+            written = _apply_entries_orm(rows, significant_only)
+
+        if written:
+            refresh_channel_progress(
+                {user_id for user_id, *_ in rows},
+                {video_channels[video_id] for _, video_id, *_ in rows},
+            )
+
+    return len(written)
+
+
+def _apply_entries_orm(rows, significant_only=False):
+    # Fallback for database backends without INSERT ... ON CONFLICT ... RETURNING
+    written = []
+    for user_id, video_id, current_time, percentage, watched_at, synced_at in rows:
+        progress, created = VideoProgress.objects.select_for_update().get_or_create(
+            user_id=user_id, video_id=video_id,
+            defaults={'current_time': current_time, 'watched_percentage': percentage, 'last_watched': watched_at},
+        )
+        if not created:
+            if significant_only:
+                moved = (
+                    current_time - progress.current_time >= SIGNIFICANT_SECONDS
+                    or percentage - progress.watched_percentage >= SIGNIFICANT_PERCENT
+                    or percentage >= COMPLETION_THRESHOLD
+                )
+            else:
+                moved = current_time > progress.current_time or percentage > progress.watched_percentage
+            if not moved:
+                continue
+            progress.current_time = max(progress.current_time, current_time)
+            progress.watched_percentage = max(progress.watched_percentage, percentage)
+            progress.last_watched = max(progress.last_watched, watched_at)
+            VideoProgress.objects.filter(pk=progress.pk).update(
+                current_time=progress.current_time,
+                watched_percentage=progress.watched_percentage,
+                last_watched=progress.last_watched,
+                synced_at=synced_at,
+            )
+        written.append((progress.current_time, progress.watched_percentage))
+    return written
+
+
+def _upsert_sql(row_count=1, significant_only=False):
+    """INSERT ... ON CONFLICT statement max-merging ``row_count`` rows of
+    (user_id, video_id, current_time, watched_percentage, last_watched, synced_at).
+
+    Rows that would not move forward are left untouched and not returned.
+    With ``significant_only`` the statement takes three more parameters (the
+    SIGNIFICANT_* thresholds and COMPLETION_THRESHOLD) and only writes
+    heartbeats that clear them.
+    """
+    qn = connection.ops.quote_name
+    table = qn(VideoProgress._meta.db_table)
+    greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+    current_time, percentage, last_watched = qn('current_time'), qn('watched_percentage'), qn('last_watched')
+    synced_at = qn('synced_at')
+    if significant_only:
+        condition = f"""excluded.{current_time} - {table}.{current_time} >= %s
+            OR excluded.{percentage} - {table}.{percentage} >= %s
+            OR excluded.{percentage} >= %s"""
+    else:
+        condition = f"""excluded.{current_time} > {table}.{current_time}
+            OR excluded.{percentage} > {table}.{percentage}"""
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * row_count)
+    return f"""
+        INSERT INTO {table} ({qn('user_id')}, {qn('video_id')}, {current_time}, {percentage}, {last_watched}, {synced_at})
+        VALUES {values}
+        ON CONFLICT ({qn('user_id')}, {qn('video_id')}) DO UPDATE SET
+            {current_time} = {greatest}({table}.{current_time}, excluded.{current_time}),
+            {percentage} = {greatest}({table}.{percentage}, excluded.{percentage}),
+            {last_watched} = {greatest}({table}.{last_watched}, excluded.{last_watched}),
+            {synced_at} = excluded.{synced_at}
+        WHERE {condition}
+        RETURNING {current_time}, {percentage}
+    """
+
+
+def upsert_progress(user_id, video_id, current_time, watched_percentage):
+    """Record a heartbeat with a single conditional INSERT ... ON CONFLICT statement.
+
+    The row is created on first sight and otherwise only moved forward (MAX
+    semantics) when the heartbeat is significant, so concurrent tabs can never
+    overwrite a higher value. Saved heartbeats refresh the user's channel
+    rollup in the same transaction. Returns ``(current_time,
+    watched_percentage, saved)`` with the stored values.
+    """
+    with transaction.atomic():
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                written_at = now()
+                cursor.execute(_upsert_sql(significant_only=True), [
+                    user_id, video_id, current_time, watched_percentage, written_at, written_at,
+                    SIGNIFICANT_SECONDS, SIGNIFICANT_PERCENT, COMPLETION_THRESHOLD,
+                ])
+                row = cursor.fetchone()
+
+            if row is None:
+                # Insignificant heartbeat: nothing was written, report the stored values
+                stored = VideoProgress.objects.values_list('current_time', 'watched_percentage').get(
+                    user_id=user_id, video_id=video_id
+                )
+                return stored[0], stored[1], False
+            result = (float(row[0]), float(row[1]), True)
+        else:
+            result = _update_progress_orm(user_id, video_id, current_time, watched_percentage)
+
+        if result[2]:
+            refresh_channel_progress([user_id], Video.objects.filter(pk=video_id).values('channel_id'))
+
+    return result
+
+
+def _update_progress_orm(user_id, video_id, current_time, watched_percentage):
+    # Fallback for database backends without INSERT ... ON CONFLICT ... RETURNING
+    progress, created = VideoProgress.objects.select_for_update().get_or_create(
+        user_id=user_id, video_id=video_id
+    )
+    saved = (
+        created
+        or current_time - progress.current_time >= SIGNIFICANT_SECONDS
+        or watched_percentage - progress.watched_percentage >= SIGNIFICANT_PERCENT
+        or watched_percentage >= COMPLETION_THRESHOLD
+    )
+    if saved:
+        progress.current_time = max(progress.current_time, current_time)
+        progress.watched_percentage = max(progress.watched_percentage, watched_percentage)
+        progress.save()
+    return progress.current_time, progress.watched_percentage, saved
+
+
+def refresh_channel_progress(user_ids, channel_ids=None, credit_watch_time=True):
+    """Recompute UserChannelProgress rollups for the given users.
+
+    One grouped aggregate over VideoProgress per call, optionally limited to
+    ``channel_ids`` (a list or a values() queryset). ``completed_at`` keeps its
+    original timestamp while the channel stays completed. Repair callers pass
+    ``credit_watch_time=False`` so watch time changes are not counted as
+    today's viewing. Returns the number of rollup rows written.
+    """
+    progress = VideoProgress.objects.filter(user_id__in=user_ids)
+    if channel_ids is not None:
+        progress = progress.filter(video__channel_id__in=channel_ids)
+
+    last_video = (
+        VideoProgress.objects
+        .filter(user_id=OuterRef('user_id'), video__channel_id=OuterRef('video__channel_id'))
+        .order_by('-last_watched')
+        .values('video_id')[:1]
+    )
+    rows = (
+        progress.order_by()
+        .values('user_id', 'video__channel_id', 'video__channel__video_count')
+        .annotate(
+            completed=Count('id', filter=Q(watched_percentage__gte=COMPLETION_THRESHOLD)),
+            watched=Sum('current_time'),
+            last_video_id=Subquery(last_video),
+        )
+    )
+
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    completed_at = {}
+    previous_watched = {}
+    for user_id, channel_id, at, watched in UserChannelProgress.objects.filter(
+        user_id__in={row['user_id'] for row in rows},
+        channel_id__in={row['video__channel_id'] for row in rows},
+    ).values_list('user_id', 'channel_id', 'completed_at', 'watched_seconds'):
+        completed_at[(user_id, channel_id)] = at
+        previous_watched[(user_id, channel_id)] = watched
+
+    current = now()
+    rollups = []
+    new_learners = Counter()
+    newly_completed = []
+    watched_delta = Counter()
+    for row in rows:
+        key = (row['user_id'], row['video__channel_id'])
+        watched_delta[key[0]] += (row['watched'] or 0) - previous_watched.get(key, 0)
+        if key not in completed_at:
+            new_learners[key[1]] += 1
+        total_videos = row['video__channel__video_count']
+        is_complete = total_videos > 0 and row['completed'] >= total_videos
+        if is_complete and completed_at.get(key) is None:
+            newly_completed.append(key)
+        rollups.append(UserChannelProgress(
+            user_id=key[0],
+            channel_id=key[1],
+            completed_videos=row['completed'],
+            watched_seconds=row['watched'] or 0,
+            last_video_id=row['last_video_id'],
+            completed_at=(completed_at.get(key) or current) if is_complete else None,
+            updated_at=current,
+        ))
+
+    UserChannelProgress.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['user', 'channel'],
+        update_fields=['completed_videos', 'watched_seconds', 'last_video', 'completed_at', 'updated_at'],
+    )
+    aggregates.learners_added(new_learners)
+    if newly_completed:
+        channels_completed.send(sender=UserChannelProgress, pairs=newly_completed)
+    watched_delta = {user_id: delta for user_id, delta in watched_delta.items() if delta}
+    if watched_delta:
+        watch_time_added.send(sender=UserChannelProgress, seconds=watched_delta, credit=credit_watch_time)
+    return len(rollups)
+
+
+def drop_orphaned_rollups(channel_id):
+    """Delete a channel's rollups whose users have no VideoProgress left in it.
+
+    refresh_channel_progress only sees users that still have progress rows,
+    so after a video is deleted the rollups of users who had only watched it
+    would stay stale. Their watch time is taken off the totals uncredited.
+    Returns the number of rollups deleted.
+    """
+    orphaned = UserChannelProgress.objects.filter(channel_id=channel_id).exclude(
+        user_id__in=VideoProgress.objects.filter(video__channel_id=channel_id).values('user_id')
+    )
+    removed = dict(orphaned.values_list('user_id', 'watched_seconds'))
+    if not removed:
+        return 0
+    orphaned.delete()
+    aggregates.refresh_learner_counts([channel_id])
+    watched_delta = {user_id: -watched for user_id, watched in removed.items() if watched}
+    if watched_delta:
+        watch_time_added.send(sender=UserChannelProgress, seconds=watched_delta, credit=False)
+    return len(removed)
+
+
+def get_channel_completion(user, channels):
+    """Map channel id to the user's completion percentage for a page of channels, in one query"""
+    channels = list(channels)
+    if not user.is_authenticated or not channels:
+        return {}
+    completed = dict(
+        UserChannelProgress.objects.filter(user=user, channel__in=channels)
+        .values_list('channel_id', 'completed_videos')
+    )
+    return {
+        channel.id: min(int(completed[channel.id] / channel.video_count * 100), 100)
+        for channel in channels
+        if channel.id in completed and channel.video_count
+    }
+
+
+def get_channel_progress(user, channel):
+    """Return the user's UserChannelProgress rollup for a channel, or None"""
+    if not user.is_authenticated:
+        return None
+    rollup = UserChannelProgress.objects.filter(user=user, channel=channel).first()
+    if rollup is not None:
+        rollup.channel = channel
+    return rollup
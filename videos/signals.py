@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import UserChannelProgress, Video
+from .progress import drop_orphaned_rollups, refresh_channel_progress
+from .importer import videos_imported
+from . import aggregates, autocomplete
+
+
+@receiver(pre_save, sender=Video)
+def remember_previous_video_state(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not raw:
+        instance._previous_state = (
+            Video.objects.filter(pk=instance.pk)
+            .values_list('channel_id', 'order', 'duration')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Video)
+def update_channel_on_video_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete.bump_generation()
+    previous = getattr(instance, '_previous_state', None)
+    if created or previous is None:
+        aggregates.video_added(instance)
+        # Nobody has watched the new video yet, so the channel is no longer complete
+        UserChannelProgress.objects.filter(
+            channel_id=instance.channel_id, completed_at__isnull=False
+        ).update(completed_at=None)
+    else:
+        aggregates.video_changed(instance, *previous)
+
+
+@receiver(post_delete, sender=Video)
+def update_channel_on_video_delete(sender, instance, **kwargs):
+    autocomplete.bump_generation()
+    aggregates.video_removed(instance)
+    refresh_channel_progress(
+        UserChannelProgress.objects.filter(channel_id=instance.channel_id).values('user_id'),
+        [instance.channel_id],
+        credit_watch_time=False,
+    )
+    drop_orphaned_rollups(instance.channel_id)
+
+
+@receiver(videos_imported, sender=Video)
+def update_channel_on_video_import(sender, channel, videos, **kwargs):
+    autocomplete.bump_generation()
+    UserChannelProgress.objects.filter(
+        channel_id=channel.id, completed_at__isnull=False
+    ).update(completed_at=None)
@@ -5,10 +5,15 @@ app_name = 'videos'
 
 urlpatterns = [
     path('<int:channel_id>/', views.video_list, name='video_list'),
+    path('<int:channel_id>/page/', views.video_list_page, name='video_list_page'),
     path('detail/<int:video_id>/', views.video_detail, name='video_detail'),
     path('<int:channel_id>/create/', views.video_create, name='video_create'),
+    path('<int:channel_id>/import/', views.video_import, name='video_import'),
+    path('<int:channel_id>/reorder/', views.video_reorder, name='video_reorder'),
     path('<int:video_id>/edit/', views.video_edit, name='video_edit'),
     path('<int:video_id>/delete/', views.video_delete, name='video_delete'),
     path('save_progress/<int:video_id>/', views.save_progress, name='save_progress'),
+    path('save_progress/batch/', views.save_progress_batch, name='save_progress_batch'),
+    path('save_progress/stats/', views.progress_buffer_stats, name='progress_buffer_stats'),
     path('ajax_search/', views.ajax_video_search, name='ajax_search'),
 ]
@@ -1,100 +1,108 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from .models import Video, VideoProgress
-from .forms import VideoForm
+from .models import PLAYLIST_FIELDS, Video, extract_youtube_id
+from .progress import get_progress_index, get_channel_progress, apply_progress_entries, upsert_progress
+from .buffer import progress_buffer
+from .pagination import keyset_page
+from . import autocomplete
+from .forms import VideoForm, VideoUploadForm
+from .importer import detect_format, import_videos, iter_rows
+from .ordering import ReorderError, VersionConflict, apply_reorder, parse_reorder_payload
 from channels.models import Channel
 from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.timezone import now
-from django.db.models import Sum
+from datetime import datetime, timezone as dt_timezone
+import io
 import json
-import re
-
-def extract_youtube_id(url):
-    """Extract YouTube video ID from various URL formats"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|\
-youtu\.be\/|youtube\.com\/embed\/)([^&?\n]+)',
-        r'youtube\.com\/watch\?.*v=([^&?\n]+)',
-        r'youtu\.be\/([^&?\n]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+import logging
+import math
 
-def video_list(request, channel_id):
-    channel = get_object_or_404(Channel, id=channel_id)
-    videos = Video.objects.filter(channel=channel).order_by('order')
+logger = logging.getLogger(__name__)
 
-    total_watched_seconds = 0
-    if request.user.is_authenticated:
-        total_watched_seconds = VideoProgress.objects.filter(
-            user=request.user, video__in=videos
-        ).aggregate(total=Sum('current_time'))['total'] or 0
+# Upper bound on entries accepted by one save_progress_batch request
+MAX_BATCH_ENTRIES = 100
 
-    progress_dict = {}
-    if request.user.is_authenticated:
-        for video in videos:
-            try:
-                prog = VideoProgress.objects.get(user=request.user, video=video)
-                progress_dict[video.id] = prog
-            except VideoProgress.DoesNotExist:
-                progress_dict[video.id] = None
-    else:
-        for video in videos:
-            progress_dict[video.id] = None
+def video_list(request, channel_id):
+    channel = get_object_or_404(Channel, id=channel_id)
+    videos, next_cursor = keyset_page(playlist_page_queryset(channel.id))
+    index = get_progress_index(request.user, videos)
+    channel_progress = get_channel_progress(request.user, channel)
 
     return render(request, 'videos/list.html', {
         'channel': channel,
-        'videos': videos,
-        'progress_dict': progress_dict,
-        'total_watched_seconds': total_watched_seconds,
+        'videos': index['videos'],
+        'progress_dict': index['progress_dict'],
+        'next_cursor': next_cursor,
+        'total_watched_seconds': channel_progress.watched_seconds if channel_progress else 0,
+        'all_completed': bool(channel_progress and channel_progress.completed_at),
     })
 
 
-@login_required
-def video_detail(request, video_id):
-    video = get_object_or_404(Video, id=video_id)
-    previous_video = video.channel.videos.filter(order__lt=video.order).order_by('-order').first()
-    next_video = video.channel.videos.filter(order__gt=video.order).order_by('order').first()
-    videos = video.channel.videos.all().order_by('order')
+# Fragment templates served by video_list_page, keyed by the ?layout= parameter
+PLAYLIST_LAYOUTS = {
+    'list': 'videos/_video_rows.html',
+    'channel': 'channels/_video_cards.html',
+}
 
-    # Extract YouTube ID for template
-    youtube_id = extract_youtube_id(video.youtube_url)
 
-    progress_dict = {}
-    total_duration = 0
-    total_watched_seconds = 0
+def playlist_page_queryset(channel_id):
+    return Video.objects.filter(channel_id=channel_id).only(*PLAYLIST_FIELDS, 'description')
 
-    for v in videos:
-        total_duration += v.duration or 0
-        try:
-            prog = VideoProgress.objects.get(user=request.user, video=v)
-            progress_dict[v.id] = prog
-            total_watched_seconds += prog.current_time
-        except VideoProgress.DoesNotExist:
-            progress_dict[v.id] = None
 
-    current_progress = progress_dict.get(video.id)
+def video_list_page(request, channel_id):
+    """Next page of a channel's playlist as rendered HTML plus the cursor after it"""
+    template_name = PLAYLIST_LAYOUTS.get(request.GET.get('layout', 'list'))
+    if template_name is None:
+        return JsonResponse({'error': 'Unknown layout'}, status=400)
+
+    channel = get_object_or_404(Channel, id=channel_id)
+    try:
+        videos, next_cursor = keyset_page(playlist_page_queryset(channel.id), request.GET.get('after'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    index = get_progress_index(request.user, videos)
+    html = render_to_string(template_name, {
+        'channel': channel,
+        'videos': index['videos'],
+        'progress_dict': index['progress_dict'],
+    }, request=request)
+    return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
+
+@login_required
+@ensure_csrf_cookie
+def video_detail(request, video_id):
+    video = get_object_or_404(Video.objects.select_related('channel'), id=video_id)
+    neighbourhood = Video.objects.neighbourhood(video)
+    videos = list(Video.objects.playlist(video.channel_id))
 
-    all_completed = all(
-        progress_dict[v.id] and progress_dict[v.id].watched_percentage >= 95
-        for v in videos
-    )
+    playlist_by_id = {v.id: v for v in videos}
+    previous_video = playlist_by_id.get(neighbourhood['prev_id'])
+    next_video = playlist_by_id.get(neighbourhood['next_id'])
+
+    index = get_progress_index(request.user, videos)
+    progress_dict = index['progress_dict']
+    current_progress = progress_dict.get(video.id)
+    channel_progress = get_channel_progress(request.user, video.channel)
 
     context = {
         'video': video,
         'previous_video': previous_video,
         'next_video': next_video,
-        'videos': videos,
+        'position': neighbourhood['position'],
+        'total_videos': neighbourhood['total'],
+        'videos': index['videos'],
         'progress_dict': progress_dict,
         'progress': current_progress,
-        'all_completed': all_completed,
-        'total_duration': total_duration,
-        'total_watched_seconds': total_watched_seconds,
-        'youtube_id': youtube_id,  # Pass YouTube ID directly
+        'all_completed': bool(channel_progress and channel_progress.completed_at),
+        'total_duration': video.channel.total_duration,
+        'total_watched_seconds': channel_progress.watched_seconds if channel_progress else 0,
     }
 
     return render(request, 'videos/detail.html', context)
@@ -107,36 +115,108 @@ def save_progress(request, video_id):
             data = json.loads(request.body)
             new_time = float(data.get('current_time', 0))
             new_percentage = float(data.get('watched_percentage', 0))
+            if not (math.isfinite(new_time) and math.isfinite(new_percentage)):
+                raise ValueError('current_time and watched_percentage must be finite numbers')
 
-            progress, created = VideoProgress.objects.get_or_create(
-                user=request.user,
-                video_id=video_id
-            )
-
-            # Only update if significant progress (reduce API calls)
-            time_diff = new_time - progress.current_time
-            percent_diff = new_percentage - progress.watched_percentage
-            
-            if (time_diff >= 10 or percent_diff >= 10 or new_percentage >= 95 or created):
-                progress.current_time = max(progress.current_time, new_time)
-                progress.watched_percentage = max(progress.watched_percentage, new_percentage)
-                progress.last_watched = now()
-                progress.save()
-                print(f"Progress saved: {new_time}s, {new_percentage}%")
+            if getattr(settings, 'PROGRESS_WRITE_BEHIND', False):
+                # Coalesce heartbeats in memory; the buffer flushes them in batches
+                current_time, watched_percentage = progress_buffer.add(
+                    request.user.id, video_id, new_time, new_percentage
+                )
+                return JsonResponse({
+                    'status': 'success',
+                    'buffered': True,
+                    'current_time': current_time,
+                    'watched_percentage': watched_percentage
+                })
+
+            try:
+                current_time, watched_percentage, saved = upsert_progress(
+                    request.user.id, video_id, new_time, new_percentage
+                )
+            except IntegrityError:
+                return JsonResponse({'error': 'Video not found'}, status=404)
 
             return JsonResponse({
                 'status': 'success',
-                'current_time': progress.current_time,
-                'watched_percentage': progress.watched_percentage
+                'current_time': current_time,
+                'watched_percentage': watched_percentage
             })
-            
+
         except (ValueError, json.JSONDecodeError) as e:
-            print(f"Progress save error: {e}")
+            logger.info('Rejected progress for video %s: %s', video_id, e)
             return JsonResponse({'error': 'Invalid data'}, status=400)
 
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
+def parse_progress_entries(raw_entries, user_id):
+    """Validate batch sync entries and coalesce them per video (max-merge)"""
+    if not isinstance(raw_entries, list) or len(raw_entries) > MAX_BATCH_ENTRIES:
+        raise ValueError('entries must be a list of at most %d items' % MAX_BATCH_ENTRIES)
+
+    current = now()
+    entries = {}
+    for raw in raw_entries:
+        video_id = int(raw['video_id'])
+        new_time = float(raw.get('current_time', 0))
+        new_percentage = float(raw.get('watched_percentage', 0))
+        if not (math.isfinite(new_time) and math.isfinite(new_percentage)):
+            raise ValueError('current_time and watched_percentage must be finite numbers')
+        new_time = max(new_time, 0)
+        new_percentage = min(max(new_percentage, 0), 100)
+
+        watched_at = current
+        client_ts = raw.get('client_ts')
+        if client_ts:
+            # client_ts is milliseconds since the epoch (JS Date.now()); never trust future times
+            watched_at = min(datetime.fromtimestamp(float(client_ts) / 1000, tz=dt_timezone.utc), current)
+
+        key = (user_id, video_id)
+        if key in entries:
+            old_time, old_percentage, old_watched_at = entries[key]
+            entries[key] = (max(old_time, new_time), max(old_percentage, new_percentage), max(old_watched_at, watched_at))
+        else:
+            entries[key] = (new_time, new_percentage, watched_at)
+    return entries
+
+
+@login_required
+def save_progress_batch(request):
+    """Apply progress for several videos at once.
+
+    Accepts a JSON body ``{"entries": [...]}`` (with the X-CSRFToken header) or a
+    form-encoded body with ``entries`` and ``csrfmiddlewaretoken`` fields, which
+    is what ``navigator.sendBeacon`` sends on page unload.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+
+    try:
+        if request.content_type == 'application/json':
+            raw_entries = json.loads(request.body).get('entries')
+        else:
+            raw_entries = json.loads(request.POST.get('entries', '[]'))
+        entries = parse_progress_entries(raw_entries, request.user.id)
+    except (ValueError, TypeError, KeyError, AttributeError, OverflowError, OSError):
+        return JsonResponse({'error': 'Invalid data'}, status=400)
+
+    if getattr(settings, 'PROGRESS_WRITE_BEHIND', False):
+        for (user_id, video_id), (current_time, percentage, watched_at) in entries.items():
+            progress_buffer.add(user_id, video_id, current_time, percentage, watched_at)
+        return JsonResponse({'status': 'success', 'buffered': True, 'accepted': len(entries)})
+
+    # Player heartbeats arrive here too, so skip the insignificant ones like save_progress does
+    saved = apply_progress_entries(entries, significant_only=True)
+    return JsonResponse({'status': 'success', 'accepted': len(entries), 'saved': saved})
+
+
+@staff_member_required
+def progress_buffer_stats(request):
+    """Expose write-behind buffer counters (batches, rows flushed per batch)"""
+    return JsonResponse(progress_buffer.get_stats())
+
+
 def convert_to_embed(youtube_url):
     """Convert YouTube URL to embed format"""
     video_id = extract_youtube_id(youtube_url)
@@ -145,6 +225,16 @@ def convert_to_embed(youtube_url):
     return youtube_url
 
 
+def is_duplicate_video(video):
+    """True if another video in the same channel points at the same YouTube id"""
+    youtube_id = extract_youtube_id(video.youtube_url)
+    if not youtube_id:
+        return False
+    return Video.objects.filter(
+        channel_id=video.channel_id, youtube_id=youtube_id
+    ).exclude(pk=video.pk).exists()
+
+
 @login_required
 def video_create(request, channel_id):
     channel = get_object_or_404(Channel, id=channel_id)
@@ -153,14 +243,35 @@ def video_create(request, channel_id):
         if form.is_valid():
             video = form.save(commit=False)
             video.channel = channel
-            video.youtube_url = convert_to_embed(video.youtube_url)
-            video.save()
-            return redirect('videos:video_list', channel_id=channel.id)
+            if is_duplicate_video(video):
+                form.add_error('youtube_url', 'This video is already in the channel.')
+            else:
+                video.youtube_url = convert_to_embed(video.youtube_url)
+                with transaction.atomic():
+                    video.save()
+                return redirect('videos:video_list', channel_id=channel.id)
     else:
-        form = VideoForm()
+        form = VideoForm(initial={'order': channel.max_order + 1})
     return render(request, 'videos/form.html', {'form': form, 'channel': channel})
 
 
+@login_required
+def video_import(request, channel_id):
+    """Owner-only bulk upload of a CSV/JSON playlist into a channel"""
+    channel = get_object_or_404(Channel, id=channel_id, owner=request.user)
+    report = None
+    if request.method == 'POST':
+        form = VideoUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            fmt = form.cleaned_data['format'] or detect_format(upload.name)
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            report = import_videos(channel, iter_rows(stream, fmt))
+    else:
+        form = VideoUploadForm()
+    return render(request, 'videos/import.html', {'form': form, 'channel': channel, 'report': report})
+
+
 @login_required
 def video_edit(request, video_id):
     video = get_object_or_404(Video, id=video_id)
@@ -168,9 +279,13 @@ def video_edit(request, video_id):
         form = VideoForm(request.POST, instance=video)
         if form.is_valid():
             video = form.save(commit=False)
-            video.youtube_url = convert_to_embed(video.youtube_url)
-            video.save()
-            return redirect('videos:video_detail', video_id=video.id)
+            if is_duplicate_video(video):
+                form.add_error('youtube_url', 'This video is already in the channel.')
+            else:
+                video.youtube_url = convert_to_embed(video.youtube_url)
+                with transaction.atomic():
+                    video.save()
+                return redirect('videos:video_detail', video_id=video.id)
     else:
         form = VideoForm(instance=video)
     return render(request, 'videos/form.html', {'form': form, 'video': video})
@@ -180,20 +295,39 @@ def video_edit(request, video_id):
 def video_delete(request, video_id):
     video = get_object_or_404(Video, id=video_id)
     if request.method == 'POST':
-        video.delete()
+        with transaction.atomic():
+            video.delete()
         return redirect('videos:video_list', channel_id=video.channel.id)
     return render(request, 'videos/confirm_delete.html', {'video': video})
 
 
+@login_required
+def video_reorder(request, channel_id):
+    """Reorder a channel's videos from a full ordering or a single move.
+
+    Responds 409 with the current version when another editor reordered the
+    channel first; the client should reload and retry.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    channel = get_object_or_404(Channel, id=channel_id, owner=request.user)
+
+    try:
+        payload = parse_reorder_payload(request.body)
+        ordering, version = apply_reorder(
+            Channel.objects.filter(pk=channel.pk), Video.objects.filter(channel_id=channel.id), 'id', payload,
+            max_order_field='max_order',
+        )
+    except ReorderError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except VersionConflict:
+        channel.refresh_from_db(fields=['order_version'])
+        return JsonResponse({'error': 'The videos were reordered by someone else', 'version': channel.order_version}, status=409)
+
+    return JsonResponse({'status': 'success', 'version': version, 'order': ordering})
+
+
 def ajax_video_search(request):
     query = request.GET.get('q', '')
-    results = []
-    if query:
-        videos = Video.objects.filter(title__icontains=query)[:5]
-        for video in videos:
-            results.append({
-                'id': video.id,
-                'title': video.title,
-                'thumbnail': video.thumbnail.url if video.thumbnail else '',
-            })
+    results = autocomplete.engine.search(query, limit=5) if query else []
     return JsonResponse({'results': results})